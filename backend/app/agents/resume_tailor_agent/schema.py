@@ -7,3 +7,5 @@ class ResumeInput(BaseModel):
     job_description: str
     ats_feedback: Optional[str] = None
     resume_length: str = Field("1 page", description="Desired length of the resume (e.g., '1 page', '2 pages', '3-4 pages', '4+ pages')")
+    omitted_items: Optional[dict[str, list[str]]] = Field(None, description="Less relevant profile items left out of existing_resume to fit resume_length, by section")
+    current_sections: Optional[dict] = Field(None, description="When refining a generated resume: the tailored sections as they are now, to revise")
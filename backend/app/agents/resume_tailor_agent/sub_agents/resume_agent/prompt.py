@@ -8,6 +8,7 @@ def resume_agent_prompt():
     2. The job description (Text).
     3. (Optional) ATS feedback (Text) from ATS agent output ar jey 'ats_feedback' .
     4. (Optional) Desired resume length (e.g., "1 page", "2 pages").
+    5. (Optional) `omitted_items`: profile entries that were already left out of the existing resume as less relevant to this job. Do not add them back or invent details for them.
 
     **CRITICAL INSTRUCTION ON LENGTH:**
     You MUST tailor the depth and quantity of the content to fit the desired `resume_length`.
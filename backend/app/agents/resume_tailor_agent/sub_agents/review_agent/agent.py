@@ -0,0 +1,18 @@
+from google.adk.agents import Agent
+from . import prompt
+from .schema import ReviewOutput
+
+
+# Reviewing a finished resume is a short answer, so a fast model is enough.
+review_agent = Agent(
+    model="gemini-2.5-flash",
+    name="ResumeReviewAgent",
+    description="Gives a hiring manager's verdict, strengths and weaknesses for a tailored resume.",
+    instruction=prompt.review_agent_prompt(),
+    output_schema=ReviewOutput,
+    output_key="resume_review",
+    # Everything it needs is in the message; the section writers' turns would only add tokens
+    include_contents="none",
+)
+
+root_agent = review_agent
@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+
+class ReviewOutput(BaseModel):
+    verdict: str = Field(..., description="As a Hiring Manager, you Verdict of the candidate based on the resume")
+    strength: List[str] = Field(default_factory=list, description="Strength of the resume")
+    weakness: List[str] = Field(default_factory=list, description="Weakness of the resume")
@@ -0,0 +1,56 @@
+from google.adk.agents import Agent, ParallelAgent
+from . import prompt
+from .schema import SummarySkillsOutput, ExperienceOutput, ProjectsOutput, CredentialsOutput
+from ..resume_agent.agent import resume_agent
+
+
+# Section writers use the same model as the single-call resume agent; each writes one slice of the resume.
+summary_skills_agent = Agent(
+    model=resume_agent.model,
+    name="SummarySkillsAgent",
+    description="Tailors the About and Skills sections to the job description.",
+    instruction=prompt.summary_skills_prompt(),
+    output_schema=SummarySkillsOutput,
+    output_key="section_summary_skills",
+)
+
+experience_agent = Agent(
+    model=resume_agent.model,
+    name="ExperienceAgent",
+    description="Tailors the Experience section to the job description.",
+    instruction=prompt.experience_prompt(),
+    output_schema=ExperienceOutput,
+    output_key="section_experience",
+)
+
+projects_agent = Agent(
+    model=resume_agent.model,
+    name="ProjectsAgent",
+    description="Tailors the Projects section to the job description.",
+    instruction=prompt.projects_prompt(),
+    output_schema=ProjectsOutput,
+    output_key="section_projects",
+)
+
+credentials_agent = Agent(
+    model=resume_agent.model,
+    name="CredentialsAgent",
+    description="Tailors the Education, Certification, Awards and Publications sections to the job description.",
+    instruction=prompt.credentials_prompt(),
+    output_schema=CredentialsOutput,
+    output_key="section_credentials",
+)
+
+# Runs the section writers concurrently; each sees the same resume input and ATS output.
+section_tailor_agent = ParallelAgent(
+    name="SectionTailorAgent",
+    description="Tailors the resume sections concurrently.",
+    sub_agents=[
+        summary_skills_agent,
+        experience_agent,
+        projects_agent,
+        credentials_agent,
+    ]
+)
+
+root_agent = section_tailor_agent
@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import List
+from app.schemas.user import *
+
+
+# Each section agent returns its slice of TailoredResume (resume_agent/schema.py) under the same field names.
+
+class SummarySkillsOutput(BaseModel):
+    about: str = Field(..., description="Tailored About for the job")
+    skills: List[Skill] = Field(..., description="Tailored Skills for the job")
+
+
+class ExperienceOutput(BaseModel):
+    experience: List[Experience] = Field(..., description="Tailored Experience for the job")
+
+
+class ProjectsOutput(BaseModel):
+    projects: List[Project] = Field(..., description="Tailored Projects for the job")
+
+
+class CredentialsOutput(BaseModel):
+    education: List[Education] = Field(..., description="Tailored Education for the job")
+    certification: List[Certification] = Field(..., description="Tailored Certification for the job")
+    awards: List[Award] = Field(..., description="Tailored Awards for the job")
+    publications: List[Publications] = Field(..., description="Tailored Publications for the job")
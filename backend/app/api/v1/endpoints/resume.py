@@ -1,24 +1,67 @@
-from fastapi import APIRouter, HTTPException, File, UploadFile, Depends
+from fastapi import APIRouter, HTTPException, File, UploadFile, Depends, Header, Query
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_db, SessionLocal
 from app.core.security import get_current_user
 from app.models.user import User
 from app.models.user_profile import UserProfile
 from app.models.generated_resume import GeneratedResume
 from pydantic import BaseModel
 from typing import Optional
-from app.agents.resume_tailor_agent.agent import root_agent
-from app.agents.resume_tailor_agent.schema import ResumeInput
 from app.services import file_service
-from google.adk.runners import InMemoryRunner
-from google.genai.types import Content, Part
-import uuid
-from fastapi.responses import FileResponse
+import json
+from fastapi.responses import StreamingResponse
+from urllib.parse import quote
+import io
 from app.services.template_service import template_service
+from app.services.office_pool import OfficePoolTimeout
+from app.services.render_cache import render_cache
+from app.services.template_registry import template_registry, UnknownTemplateError
+from app.services.export_service import export_service, ExportItem
+from app.services import llm_admission, llm_metrics, resume_generation
+from app.services.llm_admission import admission, AdmissionRejected
+from app.services.resume_generation import GenerationRequest, GenerationQueueFull, generation_jobs
+from app.services.agent_events import stream_events
+from sse_starlette.sse import EventSourceResponse
+from app.services.render_jobs import render_jobs, RenderQueueFull
+from app.schemas.resume import ExportRequest, RenderJobStatus, GenerationJobStatus, BatchGenerationRequest
+from app.core.config import settings
 
 router = APIRouter()
-app_name = "ResumeTailorAgent"
-runner = InMemoryRunner(agent=root_agent, app_name=app_name)
+
+MEDIA_TYPES = {
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pdf": "application/pdf",
+}
+PDF_RENDERERS = ("libreoffice", "native")
+
+
+def _generation_request(
+    profile_id: int, job_description: str, generation_name: str, ats_feedback: Optional[str],
+    template_id: Optional[int], resume_length: str, trim_to_length: bool, email: str, db: Session
+) -> GenerationRequest:
+    if template_id is not None and template_id not in template_registry:
+        raise HTTPException(status_code=400, detail=f"Template {template_id} does not exist")
+
+    current_user = db.query(User).filter(User.email == email).first()
+    if not current_user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    # Fetch the source profile
+    source_profile = db.query(UserProfile).filter(UserProfile.id == profile_id, UserProfile.user_id == current_user.id).first()
+    if not source_profile:
+         raise HTTPException(status_code=404, detail="Source profile not found")
+
+    return GenerationRequest(
+        user_id=current_user.id,
+        source_profile_id=source_profile.id,
+        source_profile_data=source_profile.profile_data,
+        job_description=job_description,
+        generation_name=generation_name,
+        ats_feedback=ats_feedback,
+        template_id=template_id,
+        resume_length=resume_length,
+        trim_to_length=trim_to_length,
+    )
 
 
 @router.post("/generate-resume")
@@ -29,108 +72,267 @@ async def generate_resume(
     ats_feedback: Optional[str] = None,
     template_id: Optional[int] = None,
     resume_length: str = "1 page",
+    trim_to_length: bool = False,
     email: str = Depends(get_current_user),
     db: Session = Depends(get_db)   
     ):
     """
     Generate a tailored resume based on the user's profile and job description.
+    When the estimated page count exceeds resume_length, the lowest-priority bullets
+    are trimmed only when trim_to_length is set; the estimate is saved under meta.layout.
     """
+    request = _generation_request(
+        profile_id, job_description, generation_name, ats_feedback, template_id, resume_length, trim_to_length, email, db
+    )
+    llm_metrics.set_endpoint("generate-resume")
     try:
-        current_user = db.query(User).filter(User.email == email).first()
-        if not current_user:
-            raise HTTPException(status_code=404, detail="User not found")
-
-        # Fetch the source profile
-        source_profile = db.query(UserProfile).filter(UserProfile.id == profile_id, UserProfile.user_id == current_user.id).first()
-        if not source_profile:
-             raise HTTPException(status_code=404, detail="Source profile not found")
-
-        # Prepare input for the agent
-        # We need to pass the existing resume data + JD
-        resume_input_data = {
-            "existing_resume": source_profile.profile_data,
-            "job_description": job_description,
-            "ats_feedback": ats_feedback,
-            "resume_length": resume_length
-        }
-        
-        # Validate against schema (optional but good for debugging)
-        resume_input = ResumeInput(**resume_input_data)
+        return await resume_generation.generate(request, db)
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except Exception as e:
+        print(f"Error generating resume: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Create a session
-        session_id = f"resume-session-{uuid.uuid4()}"
-        user_id = str(current_user.id)
-        session = await runner.session_service.create_session(app_name=runner.app_name, user_id=user_id, session_id=session_id)
-        
-        # Create a message
-        initial_message = Content(role="user", parts=[Part(text=resume_input.model_dump_json())])
-        
-        # Run the agent
-        async for _ in runner.run_async(user_id=user_id, session_id=session_id, new_message=initial_message):
-            pass
-        
-        final_session = await runner.session_service.get_session(app_name=runner.app_name, user_id=user_id, session_id=session_id)
-        # The result is the output of the resume agent in the sequence
-        # Expected to be ResumeOutput (tailored_resume, verdict, strength, weakness)
-        agent_output = final_session.state.get("tailored_resume")
-        
-        if not agent_output:
-             raise HTTPException(status_code=500, detail="Failed to generate resume")
 
-        # STITCHING LOGIC: Combine static info from source with dynamic info from agent
-        # agent_output is a dict corresponding to ResumeOutput schema
-        tailored_data = agent_output.get("tailored_resume", {})
-        
-        # Get static data from source profile
-        source_data = source_profile.profile_data
-        basic_info = source_data.get("basic_info", {})
-
-        # Construct the full UserResumeProfile object
-        full_resume_data = {
-            "basic_info": basic_info,
-            **tailored_data # about, skills, education, experience, etc.
-        }
+@router.post("/generate-resume/stream")
+async def generate_resume_stream(
+    profile_id: int,
+    job_description: str,
+    generation_name: str,
+    ats_feedback: Optional[str] = None,
+    template_id: Optional[int] = None,
+    resume_length: str = "1 page",
+    trim_to_length: bool = False,
+    email: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
+    ):
+    """
+    Same as /generate-resume, but streams agent events (Server-Sent Events) while it runs:
+    started, stage_started, partial, stage_finished, persisted, then final or error.
+    """
+    request = _generation_request(
+        profile_id, job_description, generation_name, ats_feedback, template_id, resume_length, trim_to_length, email, db
+    )
+    llm_metrics.set_endpoint("generate-resume/stream")
+    # Once the stream starts, a rejection can only be reported as an error event
+    try:
+        admission.check(str(request.user_id))
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
 
-        # The final result to save includes the full resume + analysis
-        final_result_to_save = {
-            "resume": full_resume_data,
-            "analysis": {
-                "verdict": agent_output.get("verdict"),
-                "strength": agent_output.get("strength"),
-                "weakness": agent_output.get("weakness")
+    async def work(on_event):
+        # The request's session closes when the response starts, so the stream uses its own
+        stream_db = SessionLocal()
+        try:
+            generated_resume = await resume_generation.generate(request, stream_db, on_event, partial=True)
+            return {
+                "id": generated_resume.id,
+                "name": generated_resume.name,
+                "template_id": generated_resume.template_id,
+                "tailored_resume_content": generated_resume.tailored_resume_content,
             }
-        }
+        finally:
+            stream_db.close()
+
+    return EventSourceResponse(stream_events(work))
+
 
-        # Save to GeneratedResume
-        generated_resume = GeneratedResume(
-            user_id=current_user.id,
-            source_profile_id=source_profile.id,
-            name=generation_name,
-            job_description=job_description,
-            template_id=template_id,
-            tailored_resume_content=final_result_to_save
+@router.post("/generate-resume/batch")
+async def generate_resume_batch(
+    batch: BatchGenerationRequest,
+    email: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
+    ):
+    """
+    Generate a tailored resume from one profile for each of several job descriptions.
+    Streams (Server-Sent Events) item_done or item_failed as each resume is saved, then final.
+    Identical job descriptions are analyzed once.
+    """
+    if len(batch.jobs) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BATCH_MAX_ITEMS} job descriptions can be generated at once")
+    base = _generation_request(
+        batch.profile_id, batch.jobs[0].job_description, batch.generation_name, batch.ats_feedback,
+        batch.template_id, batch.resume_length, batch.trim_to_length, email, db
+    )
+    requests = [
+        GenerationRequest(
+            user_id=base.user_id,
+            source_profile_id=base.source_profile_id,
+            source_profile_data=base.source_profile_data,
+            job_description=job.job_description,
+            generation_name=job.generation_name or f"{batch.generation_name} {index + 1}",
+            ats_feedback=base.ats_feedback,
+            template_id=base.template_id,
+            resume_length=base.resume_length,
+            trim_to_length=base.trim_to_length,
         )
-        db.add(generated_resume)
-        db.commit()
-        db.refresh(generated_resume)
+        for index, job in enumerate(batch.jobs)
+    ]
+    llm_metrics.set_endpoint("generate-resume/batch")
+    try:
+        admission.check(str(base.user_id))
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
 
-        return generated_resume
+    async def work(on_event):
+        # The batch bounds its own concurrency, so its runs wait for admission rather than fail
+        llm_admission.set_rejectable(False)
+        return await resume_generation.generate_batch(requests, on_event, settings.BATCH_MAX_CONCURRENCY)
 
-    except Exception as e:
-        print(f"Error generating resume: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    return EventSourceResponse(stream_events(work))
 
 
-@router.get("/download/{resume_id}")
-def download_resume(
-    resume_id: int,
-    format: str = "docx",
+@router.post("/generate-resume/jobs", status_code=202, response_model=GenerationJobStatus)
+async def submit_generation_job(
+    profile_id: int,
+    job_description: str,
+    generation_name: str,
+    ats_feedback: Optional[str] = None,
+    template_id: Optional[int] = None,
+    resume_length: str = "1 page",
+    trim_to_length: bool = False,
     email: str = Depends(get_current_user),
     db: Session = Depends(get_db)
+    ):
+    """
+    Queue a resume generation and return its job id straight away.
+    Follow progress on GET /generate-resume/jobs/{job_id}/events (Server-Sent Events).
+    """
+    request = _generation_request(
+        profile_id, job_description, generation_name, ats_feedback, template_id, resume_length, trim_to_length, email, db
+    )
+    # The job's task starts from this context, so its model calls are counted under this endpoint
+    llm_metrics.set_endpoint("generate-resume/jobs")
+    try:
+        job = generation_jobs.submit(email, request)
+    except GenerationQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
+    return job.info()
+
+
+@router.get("/generate-resume/jobs/{job_id}", response_model=GenerationJobStatus)
+async def get_generation_job(
+    job_id: str,
+    email: str = Depends(get_current_user)
 ):
     """
-    Download a generated resume in DOCX or PDF format.
+    Get the status of a generation job; resume_id is set once the result is saved.
+    """
+    job = generation_jobs.get(job_id, email)
+    if not job:
+        raise HTTPException(status_code=404, detail="Generation job not found")
+    return job.info()
+
+
+@router.get("/generate-resume/jobs/{job_id}/events")
+async def stream_generation_job(
+    job_id: str,
+    last_event_id: Optional[int] = Header(None),
+    email: str = Depends(get_current_user)
+):
+    """
+    Server-Sent Events: queued, started, ats_done, resume_drafted, persisted, then done or failed.
+    Reconnecting clients resume after the Last-Event-ID they send.
+    """
+    job = generation_jobs.get(job_id, email)
+    if not job:
+        raise HTTPException(status_code=404, detail="Generation job not found")
+
+    async def events():
+        async for event in job.subscribe(after=last_event_id if last_event_id is not None else -1):
+            yield {"id": str(event["id"]), "event": event["event"], "data": json.dumps(event["data"])}
+
+    return EventSourceResponse(events())
+
+
+@router.post("/{resume_id}/refine")
+async def refine_resume(
+    resume_id: int,
+    job_description: Optional[str] = None,
+    ats_feedback: Optional[str] = None,
+    sections: Optional[list[str]] = Query(None),
+    generation_name: Optional[str] = None,
+    template_id: Optional[int] = None,
+    resume_length: Optional[str] = None,
+    trim_to_length: bool = False,
+    email: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
+    ):
+    """
+    Save a new version of a generated resume that rewrites only the sections a change affects:
+    the given sections, those the ats_feedback targets, or those a changed job description touches.
+    The other sections are copied as they are. Omitted parameters default to the original's.
     """
+    current_user = db.query(User).filter(User.email == email).first()
+    if not current_user:
+        raise HTTPException(status_code=404, detail="User not found")
+    source = db.query(GeneratedResume).filter(
+        GeneratedResume.id == resume_id, GeneratedResume.user_id == current_user.id
+    ).first()
+    if not source:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    unknown = sorted(set(sections or []) - set(resume_generation.REFINE_SECTIONS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown sections {unknown}; choose from {list(resume_generation.REFINE_SECTIONS)}")
+
+    content = source.tailored_resume_content or {}
+    request = _generation_request(
+        source.source_profile_id,
+        job_description or source.job_description,
+        generation_name or f"{source.name} (refined)",
+        ats_feedback,
+        template_id if template_id is not None else source.template_id,
+        resume_length or content.get("meta", {}).get("resume_length", "1 page"),
+        trim_to_length, email, db,
+    )
+    affected = resume_generation.affected_sections(
+        content.get("resume", {}), request.source_profile_data, source.job_description, request.job_description,
+        ats_feedback, sections,
+    )
+    if not affected:
+        raise HTTPException(status_code=400, detail="Nothing to refine: give a new job_description, ats_feedback or sections")
+
+    llm_metrics.set_endpoint("refine")
+    try:
+        return await resume_generation.refine(source, request, affected, db)
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except Exception as e:
+        print(f"Error refining resume: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+class RenderRequest:
+    """A validated download: the resume content plus the template, format and PDF backend to render it with."""
+
+    def __init__(self, resume_data: dict, template, fmt: str, pdf_renderer: str, filename: str):
+        self.resume_data = resume_data
+        self.template = template
+        self.fmt = fmt
+        self.pdf_renderer = pdf_renderer
+        self.filename = filename
+        self.cache_key = render_cache.make_key(
+            resume_data, template.id, template.version, fmt, pdf_renderer if fmt == "pdf" else ""
+        )
+
+
+def _pdf_renderer(requested: Optional[str], template) -> str:
+    """
+    The PDF backend for a template: the requested one, else the PDF_RENDERER setting.
+    A template without a native layout falls back to LibreOffice when native is only the server default,
+    and is rejected when native was asked for.
+    """
+    pdf_renderer = (requested or settings.PDF_RENDERER).lower()
+    if pdf_renderer not in PDF_RENDERERS:
+        raise HTTPException(status_code=400, detail=f"Unknown PDF renderer '{requested}'")
+    if pdf_renderer == "native" and not template.native_pdf:
+        if requested:
+            raise HTTPException(status_code=400, detail=f"Template {template.id} does not support native PDF rendering")
+        pdf_renderer = "libreoffice"
+    return pdf_renderer
+
+
+def _render_request(resume_id: int, format: str, renderer: Optional[str], email: str, db: Session) -> RenderRequest:
     current_user = db.query(User).filter(User.email == email).first()
     if not current_user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -151,29 +353,163 @@ def download_resume(
     resume_data["template_id"] = generated_resume.template_id
 
     filename = f"{generated_resume.name.replace(' ', '_')}_{resume_id}"
-    
+    fmt = "pdf" if format.lower() == "pdf" else "docx"
+
     try:
-        # Generate DOCX
-        docx_path = template_service.generate_docx(resume_data, filename)
-        
-        if format.lower() == "pdf":
-            pdf_path = template_service.convert_to_pdf(docx_path)
-            return FileResponse(
-                path=pdf_path, 
-                filename=f"{filename}.pdf", 
-                media_type="application/pdf"
-            )
-        else:
-            return FileResponse(
-                path=docx_path, 
-                filename=f"{filename}.docx", 
-                media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-            )
+        template = template_registry.get(generated_resume.template_id)
+    except UnknownTemplateError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    pdf_renderer = _pdf_renderer(renderer, template) if fmt == "pdf" else "libreoffice"
+    return RenderRequest(resume_data, template, fmt, pdf_renderer, filename)
+
+
+def _attachment(content: bytes, filename: str, fmt: str, headers: Optional[dict] = None) -> StreamingResponse:
+    return StreamingResponse(
+        io.BytesIO(content),
+        media_type=MEDIA_TYPES[fmt],
+        headers={
+            "Content-Disposition": f"attachment; filename*=utf-8''{quote(f'{filename}.{fmt}')}",
+            "Content-Length": str(len(content)),
+            **(headers or {})
+        }
+    )
+
+
+@router.get("/download/{resume_id}")
+def download_resume(
+    resume_id: int,
+    format: str = "docx",
+    renderer: Optional[str] = None,
+    email: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Download a generated resume in DOCX or PDF format.
+    `renderer` picks the PDF backend: "libreoffice" (default) or "native".
+    """
+    request = _render_request(resume_id, format, renderer, email, db)
+
+    # Repeat downloads of unchanged content are served straight from the render cache
+    cached = render_cache.get(request.cache_key)
+    if cached is not None:
+        return _attachment(cached, request.filename, request.fmt, {"X-Render-Cache": "hit"})
+
+    try:
+        # Render in memory; only the LibreOffice converter touches the filesystem
+        content = template_service.render(request.resume_data, request.fmt, request.pdf_renderer)
+
+        render_cache.put(request.cache_key, content)
+        return _attachment(content, request.filename, request.fmt, {"X-Render-Cache": "miss"})
             
+    except OfficePoolTimeout as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         print(f"Error generating document: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/download/{resume_id}/jobs", status_code=202, response_model=RenderJobStatus)
+def submit_render_job(
+    resume_id: int,
+    format: str = "docx",
+    renderer: Optional[str] = None,
+    email: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Queue a render of a generated resume and return its job id straight away.
+    Poll GET /jobs/{job_id}, then fetch GET /jobs/{job_id}/artifact once it is done.
+    """
+    request = _render_request(resume_id, format, renderer, email, db)
+    try:
+        job = render_jobs.submit(
+            email, request.resume_data, request.fmt, request.pdf_renderer, request.filename, request.cache_key
+        )
+    except RenderQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    return job.info()
+
+@router.get("/jobs/{job_id}", response_model=RenderJobStatus)
+async def get_render_job(
+    job_id: str,
+    wait: float = 0,
+    email: str = Depends(get_current_user)
+):
+    """
+    Get the status of a render job.
+    With `wait`, long-polls: responds as soon as the job finishes, or after `wait` seconds.
+    """
+    job = render_jobs.get(job_id, email)
+    if not job:
+        raise HTTPException(status_code=404, detail="Render job not found")
+    if wait > 0:
+        await render_jobs.wait(job, min(wait, settings.RENDER_JOB_MAX_WAIT))
+    return job.info()
+
+@router.get("/jobs/{job_id}/artifact")
+def get_render_job_artifact(
+    job_id: str,
+    email: str = Depends(get_current_user)
+):
+    """
+    Download the document produced by a finished render job.
+    """
+    job = render_jobs.get(job_id, email)
+    if not job:
+        raise HTTPException(status_code=404, detail="Render job not found")
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=job.error)
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Render job is {job.status}")
+    content = job.artifact()
+    if content is None:
+        raise HTTPException(status_code=410, detail="The rendered document is no longer cached; submit the job again")
+    return _attachment(content, job.filename, job.fmt)
+
+@router.post("/export")
+def export_resumes(
+    export_request: ExportRequest,
+    email: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Download several generated resumes as a single ZIP archive.
+    Entries are rendered in parallel and streamed as they finish.
+    """
+    current_user = db.query(User).filter(User.email == email).first()
+    if not current_user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    resume_ids = list(dict.fromkeys(export_request.resume_ids))
+    if len(resume_ids) > settings.EXPORT_MAX_RESUMES:
+        raise HTTPException(status_code=400, detail=f"At most {settings.EXPORT_MAX_RESUMES} resumes can be exported at once")
+
+    resumes = db.query(GeneratedResume).filter(
+        GeneratedResume.id.in_(resume_ids),
+        GeneratedResume.user_id == current_user.id
+    ).all()
+    missing = set(resume_ids) - {r.id for r in resumes}
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Resumes not found: {sorted(missing)}")
+
+    items = []
+    for r in resumes:
+        try:
+            template = template_registry.get(r.template_id)
+        except UnknownTemplateError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        resume_data = {**r.tailored_resume_content.get("resume", {}), "template_id": r.template_id}
+        pdf_renderer = _pdf_renderer(export_request.pdf_renderer, template) if "pdf" in export_request.formats else ""
+        for fmt in dict.fromkeys(export_request.formats):
+            arcname = f"{r.name.replace(' ', '_').replace('/', '_')}_{r.id}.{fmt}"
+            items.append(ExportItem(arcname, resume_data, template.id, template.version, fmt, pdf_renderer))
+
+    return StreamingResponse(
+        export_service.iter_zip(items),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=resumes.zip"}
+    )
+
 @router.get("/", response_model=list[dict])
 def get_resumes(
     email: str = Depends(get_current_user),
@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from app.schemas.template import TemplateInfo
+from app.services.template_registry import template_registry
+
+router = APIRouter()
+
+
+@router.get("/", response_model=list[TemplateInfo])
+def list_templates():
+    """
+    List the available resume templates.
+    """
+    return [template.info() for template in template_registry.list()]
@@ -8,14 +8,41 @@ from app.models.user import User
 from app.models.user_profile import UserProfile
 from app.agents.user_profile_agent.agent import root_agent
 from app.services import file_service
-from google.adk.runners import InMemoryRunner
+from google.adk.apps import App
+from google.adk.runners import Runner
 from google.genai.types import Content, Part
 import uuid
 import json
+from app.core.database import SessionLocal
+from app.services.agent_events import run_agent_events, stream_events
+from app.services.session_store import session_store
+from app.services import llm_backend, llm_metrics
+from app.services.llm_admission import admission, AdmissionRejected
+from sse_starlette.sse import EventSourceResponse
 
 router = APIRouter()
 app_name = "ProfileAgent"
-runner = InMemoryRunner(agent=root_agent, app_name=app_name)
+runner = Runner(
+    app=App(name=app_name, root_agent=llm_backend.install(root_agent), plugins=[llm_metrics.metrics_plugin]),
+    session_service=session_store,
+)
+
+async def _extract_profile(user_id: str, resume_content: str, on_event=None):
+    """
+    Runs the profile agent on the resume in a session of its own, deleted afterwards.
+    Returns the extracted profile; agent events are passed to on_event (with partial text) when given.
+    """
+    session_id = f"user-profile-session-{uuid.uuid4()}"
+    initial_message = Content(role="user", parts=[Part(text=resume_content)])
+
+    final_result = None
+    async with session_store.reserve(runner.app_name, user_id, session_id):
+        async for event, data in run_agent_events(runner, user_id, session_id, initial_message, partial=on_event is not None):
+            if on_event:
+                await on_event(event, data)
+            if event == "stage_finished" and data["output_key"] == "user_profile":
+                final_result = data["output"]
+    return final_result
 
 @router.get("/", response_model=list[dict])
 def get_my_profiles(
@@ -45,26 +72,15 @@ async def create_profile(
     current_user = db.query(User).filter(User.email == email).first()
     if not current_user:
         raise HTTPException(status_code=404, detail="User not found")
+    llm_metrics.set_endpoint("user-profile")
     try:
-        # Create a session for the agent
-        session_id = f"user-profile-session-{uuid.uuid4()}"
-        user_id = str(current_user.id)
-        session = await runner.session_service.create_session(app_name=runner.app_name, user_id=user_id, session_id=session_id)
-        
         # Convert resume to markdown
         resume_content = file_service.convert_to_markdown(resume.file, resume.filename)
 
-        # Create a message for the agent
-        initial_message = Content(role="user", parts=[Part(text=resume_content)])
-        
         print(f"API: User Profile Agent invoked for user {current_user.email}")
 
-        # Run the agent
-        async for _ in runner.run_async(user_id=user_id, session_id=session_id, new_message=initial_message):
-            pass
-
-        final_session = await runner.session_service.get_session(app_name=runner.app_name, user_id=user_id, session_id=session_id)
-        final_result = final_session.state.get("user_profile")
+        # Run the agent; only the extracted profile is kept
+        final_result = await _extract_profile(str(current_user.id), resume_content)
         
         if not final_result:
              raise HTTPException(status_code=500, detail="Failed to generate profile")
@@ -82,10 +98,58 @@ async def create_profile(
         print(f"API: Created new profile '{profile_name}' (ID: {db_profile.id})")
         return {"id": db_profile.id, "name": db_profile.name, "profile_data": db_profile.profile_data}
 
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         print(f"Error generating profile: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/stream")
+async def create_profile_stream(
+    resume: UploadFile = File(...),
+    profile_name: str = "Default Profile",
+    email: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Same as POST /, but streams agent events (Server-Sent Events) while the profile is extracted:
+    started, stage_started, partial, stage_finished, then final (the saved profile) or error.
+    """
+    current_user = db.query(User).filter(User.email == email).first()
+    if not current_user:
+        raise HTTPException(status_code=404, detail="User not found")
+    user_id = current_user.id
+    llm_metrics.set_endpoint("user-profile/stream")
+    try:
+        admission.check(str(user_id))
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+    # Read the upload now; it is closed once the streaming response starts
+    try:
+        resume_content = file_service.convert_to_markdown(resume.file, resume.filename)
+    except Exception as e:
+        print(f"Error reading resume: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def work(on_event):
+        final_result = await _extract_profile(str(user_id), resume_content, on_event)
+        if not final_result:
+            raise RuntimeError("Failed to generate profile")
+
+        stream_db = SessionLocal()
+        try:
+            db_profile = UserProfile(user_id=user_id, name=profile_name, profile_data=final_result)
+            stream_db.add(db_profile)
+            stream_db.commit()
+            stream_db.refresh(db_profile)
+            print(f"API: Created new profile '{profile_name}' (ID: {db_profile.id})")
+            return {"id": db_profile.id, "name": db_profile.name, "profile_data": db_profile.profile_data}
+        finally:
+            stream_db.close()
+
+    return EventSourceResponse(stream_events(work))
+
 @router.put("/{profile_id}", response_model=dict)
 def update_profile(
     profile_id: int,
@@ -6,6 +6,89 @@ class Settings(BaseSettings):
     GOOGLE_API_KEY: str | None = None
     GOOGLE_GENAI_USE_VERTEXAI: bool = False
 
+    # PDF conversion worker pool (set OFFICE_POOL_SIZE=0 to use one-shot LibreOffice processes)
+    OFFICE_POOL_SIZE: int = 2
+    OFFICE_SERVER_BINARY: str = "unoserver"
+    # 0 gives each worker free ports, so several server processes (uvicorn --workers N) can each run a pool;
+    # a fixed base port (worker i uses base + 2i and base + 2i + 1) only works with a single process
+    OFFICE_POOL_BASE_PORT: int = 0
+    OFFICE_WORKER_MAX_CONVERSIONS: int = 200
+    OFFICE_WORKER_STARTUP_TIMEOUT: float = 30.0
+    OFFICE_POOL_QUEUE_TIMEOUT: float = 30.0
+    OFFICE_CONVERSION_TIMEOUT: float = 60.0
+
+    # Default PDF backend: "libreoffice" (DOCX -> LibreOffice) or "native" (direct PDF layout)
+    PDF_RENDERER: str = "libreoffice"
+
+    # On-disk cache of rendered DOCX/PDF downloads
+    RENDER_CACHE_DIR: str = "/tmp/resume-render-cache"
+    RENDER_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+
+    # Bulk ZIP export
+    EXPORT_MAX_WORKERS: int = 2
+    EXPORT_MAX_RESUMES: int = 200
+
+    # Background render jobs (POST /resume/download/{id}/jobs)
+    RENDER_JOB_WORKERS: int = 2
+    RENDER_JOB_MAX_PENDING: int = 100
+    RENDER_JOB_TTL_SECONDS: float = 600.0
+    RENDER_JOB_MAX_WAIT: float = 30.0
+
+    # Background resume generation (POST /resume/generate-resume/jobs)
+    GENERATION_MAX_CONCURRENCY: int = 4
+    GENERATION_MAX_PENDING: int = 50
+    GENERATION_JOB_TTL_SECONDS: float = 3600.0
+
+    # Batch generation (POST /resume/generate-resume/batch): job descriptions per batch, runs at a time
+    BATCH_MAX_ITEMS: int = 50
+    BATCH_MAX_CONCURRENCY: int = 4
+
+    # Resume stage: "single" (one resume agent call) or "sections" (concurrent section agents, then a review)
+    RESUME_PIPELINE: str = "single"
+
+    # Faster model for hedged and routed calls. A stage still waiting on its own model after its
+    # latency budget (None = no budget) also asks FAST_MODEL and keeps the first valid answer;
+    # 1-page resumes whose input is at most FAST_ROUTE_MAX_TOKENS (0 = never) go to FAST_MODEL directly
+    FAST_MODEL: str = "gemini-2.5-flash"
+    ATS_LATENCY_BUDGET_SECONDS: float | None = None
+    RESUME_LATENCY_BUDGET_SECONDS: float | None = None
+    FAST_ROUTE_MAX_TOKENS: int = 0
+
+    # Send only the profile items most relevant to the job description (top-K per section, K set by resume_length)
+    PROFILE_PRERANK_ENABLED: bool = True
+
+    # Admission control in front of every agent run: concurrent model calls, tokens per minute
+    # (0 = no token budget) and the wait queue; a full queue answers 429 with Retry-After
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_TOKENS_PER_MINUTE: int = 0
+    LLM_QUEUE_MAX_DEPTH: int = 100
+    LLM_QUEUE_MAX_PER_USER: int = 10
+
+    # Reuse of agent output for identical generation requests (0 entries disables the cache)
+    GENERATION_CACHE_MAX_ENTRIES: int = 256
+    GENERATION_CACHE_TTL_SECONDS: float = 3600.0
+
+    # In-memory ADK sessions; deleted after each run, evicted past these limits as a safety net
+    SESSION_STORE_MAX_SESSIONS: int = 500
+    SESSION_STORE_TTL_SECONDS: float = 1800.0
+
+    # ATS stage: "llm" (ATS agent), "local" (keyword_extractor, no model call) or
+    # "auto" (local when it recognizes at least ATS_LOCAL_MIN_SKILLS lexicon skills, else the agent)
+    ATS_EXTRACTOR: str = "llm"
+    ATS_LOCAL_MIN_SKILLS: int = 8
+
+    # Agents' model backend: "gemini", "record" (Gemini, saving responses as fixtures)
+    # or "replay" (fixtures only, no model calls; latency fixed or scaled from the recording)
+    LLM_BACKEND: str = "gemini"
+    LLM_FIXTURES_DIR: str = "llm-fixtures"
+    LLM_REPLAY_LATENCY_MS: float | None = None
+    LLM_REPLAY_LATENCY_SCALE: float = 1.0
+    LLM_REPLAY_STRICT: bool = False
+
+    # Cached ATS keyword extraction, keyed by normalized job description
+    ATS_CACHE_ENABLED: bool = True
+    ATS_CACHE_TTL_SECONDS: float = 7 * 24 * 3600
+
     class Config:
         env_file = ".env"
 
@@ -2,3 +2,4 @@
 from app.models.user import User
 from app.models.user_profile import UserProfile
 from app.models.generated_resume import GeneratedResume
+from app.models.ats_cache import ATSCacheEntry
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, JSON, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class ATSCacheEntry(Base):
+    __tablename__ = "ats_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String, unique=True, index=True)
+    model = Column(String)
+    prompt_version = Column(String)
+    output = Column(JSON)
+    hits = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_hit_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,38 @@
+
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+
+class ExportRequest(BaseModel):
+    resume_ids: List[int] = Field(..., min_length=1, description="IDs of the generated resumes to export")
+    formats: List[Literal["docx", "pdf"]] = Field(["docx"], min_length=1, description="Formats to include for every resume")
+    pdf_renderer: Optional[Literal["libreoffice", "native"]] = Field(None, description="PDF backend; defaults to the server setting")
+
+class RenderJobStatus(BaseModel):
+    job_id: str
+    status: Literal["queued", "running", "done", "failed"]
+    format: Literal["docx", "pdf"]
+    filename: str
+    error: Optional[str] = None
+    created_at: float
+    finished_at: Optional[float] = None
+
+class GenerationJobStatus(BaseModel):
+    job_id: str
+    status: Literal["queued", "running", "done", "failed"]
+    resume_id: Optional[int] = None
+    error: Optional[str] = None
+    created_at: float
+    finished_at: Optional[float] = None
+
+class BatchJob(BaseModel):
+    job_description: str = Field(..., min_length=1)
+    generation_name: Optional[str] = Field(None, description="Defaults to the batch's generation_name and the job's position")
+
+class BatchGenerationRequest(BaseModel):
+    profile_id: int
+    jobs: List[BatchJob] = Field(..., min_length=1, description="Job descriptions to tailor the profile to")
+    generation_name: str = Field("Batch", description="Name prefix for the generated resumes")
+    ats_feedback: Optional[str] = None
+    template_id: Optional[int] = None
+    resume_length: str = "1 page"
+    trim_to_length: bool = False
@@ -0,0 +1,9 @@
+
+from pydantic import BaseModel
+
+class TemplateInfo(BaseModel):
+    id: int
+    name: str
+    description: str
+    version: str
+    native_pdf: bool
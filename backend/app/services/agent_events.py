@@ -0,0 +1,90 @@
+"""
+Translates ADK runner events into a small typed event stream for clients.
+
+    started         {}                              sent as soon as the request is accepted
+    stage_started   {"stage"}                       first event from an agent
+    partial         {"stage", "text"}               streamed model text (only when partial=True)
+    stage_finished  {"stage", "output_key", "output", "elapsed_ms"}
+                                                    an agent wrote its output_key to session state
+    final           endpoint-specific result         last event on success
+    error           {"detail"}                      last event on failure
+"""
+import asyncio
+import json
+import time
+from typing import AsyncIterator, Awaitable, Callable
+
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.runners import Runner
+from google.genai.types import Content
+
+from app.services.llm_admission import admission
+
+
+async def run_agent_events(
+    runner: Runner, user_id: str, session_id: str, new_message: Content, partial: bool = False
+) -> AsyncIterator[tuple[str, dict]]:
+    """
+    Runs the agent once admitted (see llm_admission) and yields (event type, data) pairs as the run progresses.
+    Raises AdmissionRejected when the admission queue is full.
+    """
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE if partial else StreamingMode.NONE)
+    started = {}
+    async with admission.admit_run(runner.agent, user_id, new_message):
+        # Created only now, so a run waiting for admission holds no session (see session_store)
+        await runner.session_service.ensure_session(runner.app_name, user_id, session_id)
+        async for event in runner.run_async(
+            user_id=user_id, session_id=session_id, new_message=new_message, run_config=run_config
+        ):
+            stage = event.author
+            if stage not in started:
+                started[stage] = time.perf_counter()
+                yield "stage_started", {"stage": stage}
+
+            if event.partial:
+                text = "".join(part.text or "" for part in (event.content.parts if event.content else []))
+                if text:
+                    yield "partial", {"stage": stage, "text": text}
+                continue
+
+            for key, value in (event.actions.state_delta or {}).items():
+                yield "stage_finished", {
+                    "stage": stage,
+                    "output_key": key,
+                    "output": value,
+                    "elapsed_ms": round((time.perf_counter() - started[stage]) * 1000),
+                }
+
+
+EventCallback = Callable[[str, dict], Awaitable[None]]
+
+
+async def stream_events(work: Callable[[EventCallback], Awaitable[dict]]) -> AsyncIterator[dict]:
+    """
+    Runs work(on_event) as a task and yields everything it reports as Server-Sent Events,
+    ending with "final" (its return value) or "error". The work is cancelled if the client disconnects.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def on_event(event: str, data: dict):
+        await queue.put((event, data))
+
+    async def run():
+        try:
+            await queue.put(("final", await work(on_event)))
+        except Exception as e:
+            print(f"Error in streamed agent run: {e}")
+            await queue.put(("error", {"detail": str(e)}))
+        finally:
+            await queue.put(None)
+
+    task = asyncio.create_task(run())
+    try:
+        event_id = 0
+        yield {"id": str(event_id), "event": "started", "data": "{}"}
+        while (item := await queue.get()) is not None:
+            event_id += 1
+            event, data = item
+            yield {"id": str(event_id), "event": event, "data": json.dumps(data, default=str)}
+    finally:
+        task.cancel()
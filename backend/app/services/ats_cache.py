@@ -0,0 +1,120 @@
+"""
+Database cache for ATS keyword extraction.
+
+The ATS stage only sees the job description, so its output can be reused for
+every profile tailored against the same posting. Entries are keyed by the
+normalized job description plus the ATS model and a hash of its prompt and
+output schema, so changing either starts a fresh cache. Outputs from a non-Gemini
+LLM_BACKEND (recorded or replayed fixtures) get keys of their own, so they never
+answer a real model's lookup. Entries expire after ATS_CACHE_TTL_SECONDS.
+"""
+import hashlib
+import json
+import threading
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.agents.resume_tailor_agent.sub_agents.ats_agent.agent import ats_agent
+from app.core.config import settings
+from app.models.ats_cache import ATSCacheEntry
+
+
+def normalize_job_description(text: str) -> str:
+    """Unicode-normalizes, case-folds and collapses whitespace, so copy-paste differences don't miss the cache."""
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def _model_name(agent) -> str:
+    return agent.model if isinstance(agent.model, str) else agent.model.model
+
+
+def _prompt_version(agent) -> str:
+    schema = agent.output_schema.model_json_schema() if agent.output_schema else None
+    payload = json.dumps({"instruction": agent.instruction, "output_schema": schema}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:12]
+
+
+def agent_version(agent) -> str:
+    """Model plus prompt/schema hash: changes whenever the agent's output could change."""
+    return f"{_model_name(agent)}:{_prompt_version(agent)}"
+
+
+class ATSCache:
+    def __init__(self, ttl_seconds: float, agent=ats_agent):
+        self.ttl_seconds = ttl_seconds
+        self.model = _model_name(agent)
+        self.prompt_version = _prompt_version(agent)
+        self.backend = settings.LLM_BACKEND
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, job_description: str) -> str:
+        parts = {
+            "job_description": normalize_job_description(job_description),
+            "model": self.model,
+            "prompt_version": self.prompt_version,
+        }
+        # Left out for "gemini" so existing entries stay valid
+        if self.backend != "gemini":
+            parts["backend"] = self.backend
+        payload = json.dumps(parts, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _expired(self, entry: ATSCacheEntry) -> bool:
+        created_at = entry.created_at
+        if created_at.tzinfo is None:
+            # SQLite hands back naive UTC timestamps
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        return created_at < datetime.now(timezone.utc) - timedelta(seconds=self.ttl_seconds)
+
+    def get(self, db: Session, job_description: str) -> Optional[dict]:
+        entry = db.query(ATSCacheEntry).filter(ATSCacheEntry.cache_key == self.make_key(job_description)).first()
+        if entry and self._expired(entry):
+            db.delete(entry)
+            db.commit()
+            entry = None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        entry.hits = (entry.hits or 0) + 1
+        entry.last_hit_at = datetime.now(timezone.utc)
+        db.commit()
+        return entry.output
+
+    def put(self, db: Session, job_description: str, output: dict):
+        entry = ATSCacheEntry(
+            cache_key=self.make_key(job_description),
+            model=self.model,
+            prompt_version=self.prompt_version,
+            output=output,
+            hits=0,
+            created_at=datetime.now(timezone.utc),
+        )
+        db.add(entry)
+        try:
+            db.commit()
+        except IntegrityError:
+            # A concurrent generation for the same posting stored it first
+            db.rollback()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "model": self.model,
+                "prompt_version": self.prompt_version,
+                "backend": self.backend,
+            }
+
+
+ats_cache = ATSCache(ttl_seconds=settings.ATS_CACHE_TTL_SECONDS)
@@ -0,0 +1,44 @@
+"""
+Rendering a resume into document bytes, with no caching or LibreOffice.
+
+Export worker processes import only this module: anything that builds the
+render cache or TemplateService at import would, in every worker, sweep and
+evict the cache directory the parent process is writing to.
+"""
+import io
+
+from app.services import pdf_renderer
+from app.services.template_registry import template_registry
+
+
+def render_docx(resume_data: dict) -> bytes:
+    """
+    Renders the resume data with the specified template into an in-memory DOCX.
+    Returns the document bytes.
+    """
+    # template_id is injected into resume_data by the API; default to 1
+    template = template_registry.get(resume_data.get("template_id"))
+
+    # Start from the template's precompiled base document (margins + style sheet)
+    document = template.generator.new_document()
+
+    try:
+        template.generator.generate(document, resume_data)
+    except Exception as e:
+         print(f"Error rendering template {template.id}: {e}")
+         raise e
+
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def render_pdf_native(resume_data: dict) -> bytes:
+    """
+    Renders the resume data straight to PDF, without DOCX or LibreOffice.
+    Only available for templates that declare a LAYOUT.
+    """
+    template = template_registry.get(resume_data.get("template_id"))
+    if not template.native_pdf:
+        raise ValueError(f"Template {template.id} does not support native PDF rendering")
+    return pdf_renderer.render_pdf(resume_data, template.generator.LAYOUT)
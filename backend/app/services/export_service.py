@@ -0,0 +1,136 @@
+"""
+Bulk export of generated resumes as a streamed ZIP archive.
+
+DOCX and native PDF rendering are CPU-bound, so they run on a process pool.
+LibreOffice conversion is handed to the LibreOffice worker pool from threads
+in this process. Only a bounded window of renders is in flight at once, and
+each entry is written to the archive and flushed to the client as soon as it
+is ready, so memory stays flat however many resumes are exported.
+"""
+import io
+import multiprocessing
+import threading
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Iterator
+
+from app.core.config import settings
+from app.services.document_renderer import render_docx, render_pdf_native
+from app.services.render_cache import render_cache
+from app.services.template_service import template_service
+
+
+class _ZipStream(io.RawIOBase):
+    """Write-only, unseekable sink that hands zip output back in chunks."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ExportItem:
+    def __init__(self, arcname: str, resume_data: dict, template_id: int, template_version: str, fmt: str,
+                 pdf_renderer: str = "libreoffice"):
+        self.arcname = arcname
+        self.resume_data = resume_data
+        self.fmt = fmt
+        self.pdf_renderer = pdf_renderer if fmt == "pdf" else ""
+        self.cache_key = render_cache.make_key(resume_data, template_id, template_version, fmt, self.pdf_renderer)
+        self.docx_cache_key = render_cache.make_key(resume_data, template_id, template_version, "docx")
+
+
+class ExportService:
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._processes = None
+        self._threads = None
+        self._lock = threading.Lock()
+
+    def _pools(self):
+        with self._lock:
+            if self._processes is None:
+                # spawn: forking a process that runs uvicorn and LibreOffice worker threads is unsafe
+                self._processes = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                self._threads = ThreadPoolExecutor(max_workers=self.max_workers * 2, thread_name_prefix="export")
+            return self._processes, self._threads
+
+    def _render(self, item: ExportItem) -> bytes:
+        content = render_cache.get(item.cache_key)
+        if content is not None:
+            return content
+
+        processes, _ = self._pools()
+        if item.pdf_renderer == "native":
+            # Pool processes only import document_renderer, which touches neither the cache nor LibreOffice
+            content = processes.submit(render_pdf_native, item.resume_data).result()
+            render_cache.put(item.cache_key, content)
+            return content
+
+        # A PDF entry can start from the DOCX rendered for the same resume
+        content = render_cache.get(item.docx_cache_key)
+        if content is None:
+            content = processes.submit(render_docx, item.resume_data).result()
+            render_cache.put(item.docx_cache_key, content)
+        if item.fmt == "pdf":
+            content = template_service.convert_to_pdf(content)
+            render_cache.put(item.cache_key, content)
+        return content
+
+    def iter_zip(self, items: list[ExportItem]) -> Iterator[bytes]:
+        """
+        Renders the items concurrently and yields the ZIP archive incrementally,
+        in completion order.
+        """
+        _, threads = self._pools()
+        window = self.max_workers * 2
+        pending = {}
+        queued = iter(items)
+        stream = _ZipStream()
+
+        def submit_next():
+            item = next(queued, None)
+            if item is not None:
+                pending[threads.submit(self._render, item)] = item
+
+        try:
+            with zipfile.ZipFile(stream, mode="w", compression=zipfile.ZIP_STORED) as archive:
+                for _ in range(window):
+                    submit_next()
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        item = pending.pop(future)
+                        # DOCX and PDF are already compressed, so entries are stored as-is
+                        archive.writestr(item.arcname, future.result())
+                        submit_next()
+                    yield stream.drain()
+            yield stream.drain()
+        finally:
+            # Client went away or a render failed: don't keep rendering for nobody.
+            for future in pending:
+                future.cancel()
+
+    def shutdown(self):
+        with self._lock:
+            if self._processes is not None:
+                self._threads.shutdown(wait=False, cancel_futures=True)
+                self._processes.shutdown(wait=False, cancel_futures=True)
+                self._processes = None
+                self._threads = None
+
+
+export_service = ExportService(max_workers=settings.EXPORT_MAX_WORKERS)
@@ -0,0 +1,121 @@
+"""
+Deduplication for resume generation: a bounded in-memory cache of recent agent
+outputs, and single-flight coalescing so concurrent identical requests share
+one pipeline run instead of each calling the model. Every caller of a shared
+run gets its events, including those reported before it joined.
+"""
+import asyncio
+import contextvars
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from app.services.agent_events import EventCallback
+
+
+class ResultCache:
+    """LRU cache with a per-entry TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()  # key -> (stored at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(**parts) -> str:
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.time() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: dict):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses}
+
+
+class _Flight:
+    """A run in flight, the callers waiting on it, and the events it has reported so far."""
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.history: list[tuple[str, dict]] = []
+        self.subscribers: list[EventCallback] = []
+
+    async def publish(self, event: str, data: dict):
+        # Streamed model text only matters live; the rest is kept for callers that join later
+        if event != "partial":
+            self.history.append((event, data))
+        for on_event in list(self.subscribers):
+            try:
+                await on_event(event, data)
+            except Exception as e:
+                # One caller's broken stream must not fail the run the others are waiting on
+                print(f"Dropped a {event} event for a caller of a shared run: {e}")
+
+
+class SingleFlight:
+    """Runs at most one task per key; callers arriving while it runs wait for the same result."""
+
+    def __init__(self):
+        self._inflight: dict[str, _Flight] = {}
+        self.coalesced = 0
+
+    def running(self, key: str) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: str, factory: Callable[[EventCallback], Awaitable[dict]], on_event: EventCallback,
+                 context: Optional[contextvars.Context] = None) -> tuple[dict, bool]:
+        """
+        Returns (result, leader); leader is False when the caller joined a run already in flight.
+        The run is factory(publish), executed in `context` (default: a copy of the leader's);
+        whatever it publishes goes to the on_event of every caller still waiting.
+        """
+        flight = self._inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _Flight()
+            flight.task = asyncio.create_task(factory(flight.publish), context=context)
+            self._inflight[key] = flight
+            flight.task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+            # Catch up on what the run reported before this caller joined; no await between
+            # the last check and subscribing, so nothing published meanwhile is missed
+            seen = 0
+            while seen < len(flight.history):
+                await on_event(*flight.history[seen])
+                seen += 1
+        flight.subscribers.append(on_event)
+        try:
+            # shield: a caller that goes away must not cancel the run the others are waiting on
+            return await asyncio.shield(flight.task), leader
+        finally:
+            flight.subscribers.remove(on_event)
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._inflight), "coalesced": self.coalesced}
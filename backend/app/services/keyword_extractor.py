@@ -0,0 +1,278 @@
+"""
+Local ATS keyword extraction, a model-free alternative to the ATS agent.
+
+Skills are recognized with the curated lexicon in skill_lexicon (so "k8s" and
+"Kubernetes" are one keyword), and other salient phrases are taken from the
+job description's n-grams. Capitalized phrases outside the lexicon are mostly
+company and product names ("Acme Pay"), so they are left out. Candidates are ranked by TF-IDF, treating each
+sentence of the job description as a document: a term named in many places
+scores higher than one mentioned once, but wording that appears in every
+sentence carries little weight. Comparing the keywords with the profile's
+skills and experience gives the ATSOutput `weaknesses` (lexicon skills only) as well, so the whole
+ATS stage can run in milliseconds.
+"""
+import hashlib
+import json
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Optional
+
+from app.services.skill_lexicon import CASE_SENSITIVE, SKILL_LEXICON
+
+# Bump when the scoring changes, so generation results cached under the old output go stale
+EXTRACTOR_VERSION = 3
+
+MAX_NGRAM = 3
+MAX_KEYWORDS = 25
+MAX_TIPS = 3
+# Lexicon skills outrank other phrases with the same TF-IDF score
+LEXICON_BOOST = 2.0
+# Phrases outside the lexicon need this many mentions, unless they are acronyms or have inner capitals (PCI DSS)
+MIN_PHRASE_COUNT = 2
+
+STOPWORDS = frozenset("""
+a about above across after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each either etc few for from further
+had has have having he her here hers him his how i if in into is it its itself just least less like may
+me might more most must my no nor not now of off on once only or other our ours out over own per plus
+same shall she should so some such than that the their theirs them then there these they this those
+through to too under until up upon us very via was we were what when where whether which while who
+whom why will with within without would yet you your yours
+ability able experience experienced years year strong excellent good great solid proven preferred
+required requirements requirement responsibilities responsible qualifications qualification skills
+skill knowledge understanding familiarity familiar including include includes work working works job
+role position team teams candidate candidates company opportunity opportunities environment plus bonus
+ideal looking join help new using use well across related relevant similar equivalent degree field
+minimum least nice must-have e.g i.e etc. day days time build building develop developing ensure
+senior junior lead staff principal engineer engineers engineering developer developers intern
+""".split())
+
+_TOKEN_RE = re.compile(r"[A-Za-z0-9.+#&/\-]+")
+# Sentence boundaries: line breaks, bullets, semicolons, colons, spaced dashes and sentence-ending punctuation
+_SENTENCE_RE = re.compile(r"[\n\r•;:!?]+|\.(?=\s|$)|\s[-–—]\s")
+
+
+def _version() -> str:
+    payload = json.dumps([EXTRACTOR_VERSION, SKILL_LEXICON, sorted(CASE_SENSITIVE)], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:12]
+
+
+def _raw_tokens(text: str) -> list[str]:
+    tokens = []
+    for raw in _TOKEN_RE.findall(text):
+        # Keep a leading dot (".NET") but not sentence punctuation around the word
+        raw = raw.rstrip(".-/&").lstrip("-/&")
+        if raw:
+            tokens.append(raw)
+    return tokens
+
+
+# Hyphenated or slashed aliases ("ci/cd", "front-end") are kept whole; other such tokens are split
+_COMPOUND_TOKENS = {
+    token.lower()
+    for name, aliases in SKILL_LEXICON.items()
+    for alias in [name, *aliases]
+    for token in _raw_tokens(alias)
+    if "/" in token or "-" in token
+}
+
+
+# Aliases that are a single token ("c++", "python"), lowercased
+_SINGLE_TOKEN_ALIASES = {
+    alias.lower()
+    for name, aliases in SKILL_LEXICON.items()
+    for alias in [name, *aliases]
+    if len(_raw_tokens(alias)) == 1
+}
+
+
+def _tokens(text: str) -> list[str]:
+    tokens = []
+    for token in _raw_tokens(text):
+        if ("/" in token or "-" in token) and token.lower() not in _COMPOUND_TOKENS:
+            parts = [part for part in re.split(r"[/\-]", token) if part]
+            # One-letter fragments ("C-level", "A/B testing") are not words, let alone skills,
+            # unless the token is a list of skills ("C/C++")
+            if not any(len(part) > 1 and part.lower() in _SINGLE_TOKEN_ALIASES for part in parts):
+                parts = [part for part in parts if len(part) > 1]
+            tokens.extend(parts)
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def _build_alias_index():
+    exact, folded = {}, {}
+    for name, aliases in SKILL_LEXICON.items():
+        for alias in [name, *aliases]:
+            key = tuple(_tokens(alias))
+            if alias in CASE_SENSITIVE:
+                exact[key] = name
+            else:
+                folded[tuple(token.lower() for token in key)] = name
+    longest = max(len(key) for key in [*exact, *folded])
+    return exact, folded, longest
+
+
+_EXACT_ALIASES, _FOLDED_ALIASES, _LONGEST_ALIAS = _build_alias_index()
+VERSION = _version()
+
+
+def _match_skills(tokens: list[str]) -> tuple[list[str], set[int]]:
+    """Greedy longest-first lexicon match; returns the canonical skills and the token positions they cover."""
+    skills, covered = [], set()
+    i = 0
+    while i < len(tokens):
+        for n in range(min(_LONGEST_ALIAS, len(tokens) - i), 0, -1):
+            span = tuple(tokens[i:i + n])
+            name = _EXACT_ALIASES.get(span) or _FOLDED_ALIASES.get(tuple(t.lower() for t in span))
+            if name:
+                skills.append(name)
+                covered.update(range(i, i + n))
+                i += n
+                break
+        else:
+            i += 1
+    return skills, covered
+
+
+def analyze(text: str) -> list[str]:
+    """Search terms for text: lowercased content words, with each lexicon skill as one canonical term."""
+    tokens = _tokens(text)
+    skills, covered = _match_skills(tokens)
+    words = [
+        token.lower() for i, token in enumerate(tokens)
+        if i not in covered and token.lower() not in STOPWORDS
+    ]
+    return [name.lower() for name in skills] + words
+
+
+def _salient(token: str) -> bool:
+    """Looks like a technical term: an acronym or inner capitals (PCI, GraphQL)."""
+    return any(c.isupper() for c in token[1:])
+
+
+def _title_case(token: str, position: int) -> bool:
+    """Capitalized away from the sentence start, like the words of a company or product name."""
+    return position > 0 and token[0].isupper() and not _salient(token)
+
+
+def _phrases(tokens: list[str], covered: set[int]) -> list[tuple[str, bool]]:
+    """
+    (surface form, salient) for each n-gram of content words outside the lexicon matches.
+    N-grams with a Title Case word are names ("Acme Pay", "Payments Platform"), not requirements, and are skipped.
+    """
+    phrases = []
+    run: list[tuple[int, str]] = []
+    for i, token in enumerate([*tokens, ""]):
+        content = token and i not in covered and token.lower() not in STOPWORDS and not token[0].isdigit()
+        if content:
+            run.append((i, token))
+            continue
+        for start in range(len(run)):
+            for n in range(1, min(MAX_NGRAM, len(run) - start) + 1):
+                gram = run[start:start + n]
+                if any(_title_case(token, i) for i, token in gram):
+                    continue
+                salient = all(_salient(token) for _, token in gram)
+                # Single common words ("design", "scale") say little on their own
+                if n == 1 and not salient:
+                    continue
+                phrases.append((" ".join(token for _, token in gram), salient))
+        run = []
+    return phrases
+
+
+def extract_keywords(job_description: str, max_keywords: int = MAX_KEYWORDS) -> list[str]:
+    """Ranked keywords: canonical lexicon skills and other salient phrases from the job description."""
+    sentences = [s for s in _SENTENCE_RE.split(job_description) if s and s.strip()]
+    term_counts: Counter = Counter()
+    doc_counts: Counter = Counter()
+    surface_forms: dict[str, Counter] = defaultdict(Counter)
+    is_skill, is_salient = set(), set()
+
+    for sentence in sentences:
+        tokens = _tokens(sentence)
+        skills, covered = _match_skills(tokens)
+        terms = []
+        for name in skills:
+            terms.append(name)
+            surface_forms[name][name] += 1
+            is_skill.add(name)
+        for phrase, salient in _phrases(tokens, covered):
+            key = phrase.lower()
+            terms.append(key)
+            surface_forms[key][phrase] += 1
+            if salient:
+                is_salient.add(key)
+        term_counts.update(terms)
+        doc_counts.update(set(terms))
+
+    n_docs = len(sentences)
+    scores = {}
+    for term, count in term_counts.items():
+        if term not in is_skill and term not in is_salient and count < MIN_PHRASE_COUNT:
+            continue
+        idf = math.log((1 + n_docs) / (1 + doc_counts[term])) + 1
+        score = (1 + math.log(count)) * idf
+        scores[term] = score * LEXICON_BOOST if term in is_skill else score
+
+    keywords: list[str] = []
+    # Ties go to the longer phrase, so "PCI DSS" is picked before "DSS"
+    for term in sorted(scores, key=lambda t: (-scores[t], -len(t.split()), t)):
+        keyword = surface_forms[term].most_common(1)[0][0]
+        # "Payments" adds nothing once "Payments Platform" is in
+        if any(f" {keyword.lower()} " in f" {chosen.lower()} " for chosen in keywords):
+            continue
+        keywords.append(keyword)
+        if len(keywords) >= max_keywords:
+            break
+    return keywords
+
+
+def known_skills(keywords: list[str]) -> list[str]:
+    return [keyword for keyword in keywords if keyword in SKILL_LEXICON]
+
+
+def _profile_texts(profile: dict) -> list[str]:
+    texts = []
+    for group in profile.get("skills") or []:
+        texts.append(group.get("category") or "")
+        texts.extend(group.get("skills") or [])
+    for experience in profile.get("experience") or []:
+        texts.append(experience.get("job_title") or "")
+        texts.extend(experience.get("description") or [])
+    return texts
+
+
+def coverage_gaps(keywords: list[str], profile: dict) -> list[str]:
+    """Keywords with no evidence in the profile's skills or experience."""
+    skills, words = set(), []
+    for text in _profile_texts(profile):
+        tokens = _tokens(text)
+        skills.update(_match_skills(tokens)[0])
+        words.append(" ".join(tokens).lower())
+    profile_text = f" {' | '.join(words)} "
+    return [
+        keyword for keyword in keywords
+        if keyword not in skills and f" {' '.join(_tokens(keyword)).lower()} " not in profile_text
+    ]
+
+
+def extract_ats_output(job_description: str, profile: Optional[dict] = None) -> dict:
+    """An ATSOutput (keywords, weaknesses, tips) built without a model call."""
+    keywords = extract_keywords(job_description)
+    missing = coverage_gaps(keywords, profile) if profile else []
+    matched = [keyword for keyword in keywords if keyword not in missing]
+    # Only a lexicon skill is known to be a requirement; other phrases may just describe the employer
+    gaps = known_skills(missing)
+
+    tips = [f"If you have worked with {gap}, name it in your skills or an experience bullet." for gap in gaps[:MAX_TIPS]]
+    if matched:
+        tips.append(f"Lead your experience bullets with the keywords you already match: {', '.join(matched[:5])}.")
+    return {
+        "keywords": keywords,
+        "weaknesses": [f"{gap} is asked for in the job description but not shown in your skills or experience." for gap in gaps],
+        "tips": tips,
+    }
@@ -0,0 +1,264 @@
+"""
+Fast page-count estimate for a rendered resume, without rendering it.
+
+Text is word-wrapped with per-character font advances, using each template's
+LAYOUT (margins, font sizes, spacing), and the resulting lines are paginated
+the way the native PDF backend (pdf_renderer) lays them out: the same fonts and
+line height, CSS margin collapsing, and paragraphs split line by line across
+pages. Rounded up, the estimate matches the native render's page count on the
+fixtures in benchmarks/layout_accuracy.py. DOCX and LibreOffice output can
+still differ by a few lines, so the estimate flags overflow against the
+requested `resume_length`, and bullets are trimmed only when the caller opts in.
+"""
+import copy
+import os
+import re
+from typing import Optional
+
+import pymupdf
+
+from app.services.pdf_renderer import FONT_FILES, LINE_HEIGHT
+
+PAGE_HEIGHT_PT = 11 * 72  # US Letter, same as python-docx's default template
+PAGE_WIDTH_PT = 8.5 * 72
+BULLET_INDENT_PT = 18  # "List Bullet" hangs text 0.25in from the margin
+
+# MuPDF's default body margin (1em of the body font) narrows the text and pushes the first page's content down
+BODY_MARGIN_EM = 1.0
+# The heading's bottom border sits under 1pt of padding (pdf_renderer's .heading)
+HEADING_BORDER_PADDING_PT = 1
+
+# Trimming stops this far below the page budget, to absorb estimation error
+FIT_MARGIN_PAGES = 0.04
+
+
+class _FontMetrics:
+    """Per-character advance widths (in em) for a regular and bold face, cached on first use."""
+
+    def __init__(self, regular: pymupdf.Font, bold: pymupdf.Font):
+        self._fonts = {False: regular, True: bold}
+        self._advances = {False: {}, True: {}}
+
+    def width(self, text: str, size: float, bold: bool = False) -> float:
+        advances = self._advances[bold]
+        total = 0.0
+        for char in text:
+            advance = advances.get(char)
+            if advance is None:
+                advance = self._fonts[bold].glyph_advance(ord(char))
+                advances[char] = advance
+            total += advance
+        return total * size
+
+
+_metrics_cache: dict[str, _FontMetrics] = {}
+
+
+def _metrics(font: str) -> _FontMetrics:
+    """The faces pdf_renderer renders with: the font's files when installed, else Helvetica."""
+    if font not in _metrics_cache:
+        spec = FONT_FILES.get(font)
+        if spec and all(os.path.exists(os.path.join(spec["dir"], f)) for f in spec["faces"].values()):
+            regular = pymupdf.Font(fontfile=os.path.join(spec["dir"], spec["faces"][("normal", "normal")]))
+            bold = pymupdf.Font(fontfile=os.path.join(spec["dir"], spec["faces"][("bold", "normal")]))
+            _metrics_cache[font] = _FontMetrics(regular, bold)
+        else:
+            _metrics_cache[font] = _FontMetrics(pymupdf.Font("helv"), pymupdf.Font("hebo"))
+    return _metrics_cache[font]
+
+
+class Block:
+    """One paragraph: its wrapped line count, the height under its lines (border) and its margins, in points."""
+
+    def __init__(self, lines: int, line_height: float, space_before: float = 0, space_after: float = 0, key=None,
+                 extra: float = 0):
+        self.lines = lines
+        self.line_height = line_height
+        self.space_before = space_before
+        self.space_after = space_after
+        self.extra = extra
+        self.key = key  # ("experience"|"projects", entry index, bullet index) for trimmable bullets
+
+
+# MuPDF also breaks lines after a hyphen or slash ("event-" / "driven", "CI/" / "CD")
+_WORD_PIECE_RE = re.compile(r"[^-/]*[-/]+|[^-/]+")
+
+
+def _count_lines(runs: list, width: float, size: float, metrics: _FontMetrics) -> int:
+    """Greedy word wrap of (text, bold) runs into lines of the given width."""
+    lines = 1
+    x = 0.0
+    space = metrics.width(" ", size)
+    for text, bold in runs:
+        for word in text.split():
+            for n, piece in enumerate(_WORD_PIECE_RE.findall(word)):
+                w = metrics.width(piece, size, bold)
+                gap = space if x > 0 and n == 0 else 0
+                if x > 0 and x + gap + w > width:
+                    lines += 1
+                    x = w
+                else:
+                    x += gap + w
+    return lines
+
+
+def measure(resume_data: dict, layout: dict) -> list[Block]:
+    """Lays out the same paragraphs pdf_renderer.build_html emits, as Blocks."""
+    metrics = _metrics(layout["font"])
+    size = layout["body_size"]
+    width = PAGE_WIDTH_PT - 2 * layout["margin_inches"] * 72 - 2 * size * BODY_MARGIN_EM
+    blocks = []
+
+    def paragraph(runs, space_before=0, space_after=0, indent=0, font_size=size, key=None, extra=0):
+        lines = _count_lines(runs, width - indent, font_size, metrics)
+        blocks.append(Block(lines, font_size * LINE_HEIGHT, space_before, space_after, key, extra))
+
+    def heading(text):
+        border = layout["heading_border_eighths"] / 8 + HEADING_BORDER_PADDING_PT
+        paragraph([(text, True)], layout["heading_space_before"], layout["heading_space_after"],
+                  font_size=layout["heading_size"], extra=border)
+
+    basic_info = resume_data.get("basic_info", {})
+    paragraph([(f"{basic_info.get('first_name', '')} {basic_info.get('last_name', '')}", True)],
+              font_size=layout["name_size"])
+    addr = basic_info.get("address")
+    contact = [", ".join(p for p in [addr.get("city"), addr.get("state")] if p)] if isinstance(addr, dict) else []
+    contact += [str(basic_info[f]) for f in ("email", "phone") if basic_info.get(f)]
+    if basic_info.get("linkedin_profile"):
+        contact.append("LinkedIn")
+    paragraph([(" | ".join(c for c in contact if c), False)], space_after=layout["contact_space_after"])
+
+    if resume_data.get("about"):
+        heading("SUMMARY")
+        paragraph([(resume_data["about"], False)])
+
+    if resume_data.get("skills"):
+        heading("TECHNICAL PROFICIENCIES")
+        for group in resume_data["skills"]:
+            paragraph([(f"{group.get('category', 'Skills')}: ", True), (", ".join(group.get("skills", [])), False)])
+
+    for section, title in (("experience", "WORK EXPERIENCE"), ("projects", "PROJECTS")):
+        if not resume_data.get(section):
+            continue
+        heading(title)
+        for i, entry in enumerate(resume_data[section]):
+            if section == "experience":
+                runs = [(f"{entry.get('company_name', '')} - {entry.get('job_title', '')}", True),
+                        (f" | {entry.get('start_date', '')} - {entry.get('end_date', '')}", False)]
+            else:
+                runs = [(entry.get("name", ""), True)]
+            paragraph(runs, layout["entry_space_before"], layout["entry_space_after"])
+            for j, bullet in enumerate(entry.get("description", [])):
+                paragraph([(bullet, False)], indent=BULLET_INDENT_PT, key=(section, i, j))
+
+    if resume_data.get("education"):
+        heading("EDUCATION")
+        for edu in resume_data["education"]:
+            paragraph([(f"{edu.get('school_name', '')} | {edu.get('degree', '')}", True),
+                       (f" | {edu.get('start_date', '')} - {edu.get('end_date', '')}", False)],
+                      layout["education_space"], layout["education_space"])
+
+    if resume_data.get("awards"):
+        heading("ACHIEVEMENTS")
+        for award in resume_data["awards"]:
+            paragraph([(f"{award.get('name', '')}: ", True), (award.get("description", ""), False)],
+                      indent=BULLET_INDENT_PT)
+
+    return blocks
+
+
+def paginate(blocks: list[Block], layout: dict, skip: Optional[set] = None) -> float:
+    """
+    Returns the estimated page count: full pages plus the used fraction of the last one.
+    Blocks whose key is in `skip` are left out.
+    """
+    page_height = PAGE_HEIGHT_PT - 2 * layout["margin_inches"] * 72
+    pages = 1
+    y = layout["body_size"] * BODY_MARGIN_EM
+    margin = 0.0  # the previous block's space_after, not yet placed
+    for block in blocks:
+        if skip and block.key in skip:
+            continue
+        # Adjacent margins collapse to the larger one, and are dropped at the top of a page
+        gap = max(margin, block.space_before) if y > 0 else 0.0
+        for _ in range(block.lines):
+            if y + gap + block.line_height > page_height:
+                pages += 1
+                y = 0.0
+                gap = 0.0
+            y += gap + block.line_height
+            gap = 0.0
+        y = min(y + block.extra, page_height)
+        margin = block.space_after
+    return pages - 1 + y / page_height
+
+
+def target_pages(resume_length: str) -> Optional[int]:
+    """
+    Maps a resume_length like "1 page", "2 pages", "3-4 pages" to a page budget.
+    Open-ended lengths ("4+ pages") have no budget.
+    """
+    if not resume_length or "+" in resume_length:
+        return None
+    numbers = [int(n) for n in re.findall(r"\d+", resume_length)]
+    return max(numbers) if numbers else None
+
+
+def _trim_order(resume_data: dict) -> list[tuple]:
+    """
+    Bullets in the order they are dropped: project bullets first (last project first),
+    then experience bullets from the oldest role. Every entry keeps its first bullet,
+    and within an entry the last bullet goes first.
+    """
+    order = []
+    for section in ("projects", "experience"):
+        entries = resume_data.get(section) or []
+        for i in reversed(range(len(entries))):
+            bullets = entries[i].get("description") or []
+            order.extend((section, i, j) for j in reversed(range(1, len(bullets))))
+    return order
+
+
+def fit_to_length(resume_data: dict, layout: dict, resume_length: str, trim: bool = False) -> tuple[dict, dict]:
+    """
+    Estimates the page count of resume_data and, when it overflows resume_length
+    and `trim` is set, drops the lowest-priority bullets until it fits.
+    Returns (resume_data, report); resume_data is only copied when something is trimmed,
+    and every dropped bullet is listed under report["trimmed"].
+    """
+    budget = target_pages(resume_length)
+    blocks = measure(resume_data, layout)
+    before = paginate(blocks, layout)
+    report = {
+        "target_pages": budget,
+        "estimated_pages_before": round(before, 2),
+        "estimated_pages": round(before, 2),
+        "overflow": budget is not None and before > budget,
+        "trimmed_bullets": 0,
+        "trimmed": [],
+    }
+    if not report["overflow"] or not trim:
+        return resume_data, report
+
+    dropped = set()
+    estimate = before
+    for key in _trim_order(resume_data):
+        dropped.add(key)
+        estimate = paginate(blocks, layout, dropped)
+        if estimate <= budget - FIT_MARGIN_PAGES:
+            break
+
+    trimmed = copy.deepcopy(resume_data)
+    for section, i, j in sorted(dropped, reverse=True):
+        del trimmed[section][i]["description"][j]
+
+    report.update({
+        "estimated_pages": round(estimate, 2),
+        "overflow": estimate > budget,
+        "trimmed_bullets": len(dropped),
+        "trimmed": [
+            {"section": section, "entry": i, "text": resume_data[section][i]["description"][j]}
+            for section, i, j in sorted(dropped)
+        ],
+    })
+    return trimmed, report
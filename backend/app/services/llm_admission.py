@@ -0,0 +1,267 @@
+"""
+Admission control for agent runs, so a burst of requests queues in front of
+Gemini instead of running into its rate limits.
+
+Every agent run is admitted first (admission.admit_run):
+- at most LLM_MAX_CONCURRENCY model calls in flight; a ParallelAgent run
+  takes one slot per LLM agent, since they all call the model at once;
+- at most LLM_TOKENS_PER_MINUTE tokens per minute, counting the tokens model
+  calls used in the last minute (reported by the metrics plugin) plus an
+  estimate for every run in flight. 0 disables the budget;
+- runs that have to wait are queued per user and admitted round-robin across
+  users, so a user's burst waits behind their own runs, not everyone's;
+- when LLM_QUEUE_MAX_DEPTH runs are waiting, or LLM_QUEUE_MAX_PER_USER for
+  this user, AdmissionRejected is raised straight away with a Retry-After
+  estimate, which the endpoints return as 429.
+
+Background generation jobs are already bounded by their own queue, so they
+call set_rejectable(False) and always wait.
+"""
+import asyncio
+import contextvars
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from google.adk.agents import LlmAgent, ParallelAgent
+from google.genai.types import Content
+
+from app.core.config import settings
+from app.services.metrics import registry
+from app.services.prompt_serializer import estimate_tokens
+
+# Output tokens reserved per model call until the call reports what it used
+RESERVED_OUTPUT_TOKENS = 4000
+
+TOKEN_WINDOW_SECONDS = 60.0
+
+# Retry-After is the expected wait for the queue ahead, within these bounds (seconds)
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 120
+
+# Assumed run duration for Retry-After until runs have been timed
+INITIAL_RUN_SECONDS = 10.0
+
+queue_depth = registry.gauge("llm_admission_queue_depth", "Agent runs waiting for admission.")
+users_queued = registry.gauge("llm_admission_users_queued", "Users with agent runs waiting for admission.")
+slots_in_flight = registry.gauge("llm_admission_in_flight", "Concurrency slots held by admitted agent runs.")
+window_tokens = registry.gauge("llm_admission_window_tokens", "Tokens used in the last minute plus those reserved by runs in flight.")
+wait_seconds = registry.histogram(
+    "llm_admission_wait_seconds", "Time agent runs waited for admission.",
+    buckets=(0.01, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+rejections = registry.counter("llm_admission_rejected_total", "Agent runs refused because the queue was full.", ("reason",))
+
+_rejectable: contextvars.ContextVar[bool] = contextvars.ContextVar("llm_admission_rejectable", default=True)
+
+
+def set_rejectable(rejectable: bool):
+    _rejectable.set(rejectable)
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _llm_agents(agent) -> list:
+    agents = [agent] if isinstance(agent, LlmAgent) else []
+    for sub_agent in agent.sub_agents:
+        agents.extend(_llm_agents(sub_agent))
+    return agents
+
+
+def estimate_run(agent, message: Content) -> tuple[int, int]:
+    """The concurrency slots and tokens a run of `agent` on `message` may take."""
+    message_tokens = estimate_tokens("".join(part.text or "" for part in message.parts or []))
+    llm_agents = _llm_agents(agent)
+    tokens = sum(
+        estimate_tokens(a.instruction if isinstance(a.instruction, str) else "") + message_tokens + RESERVED_OUTPUT_TOKENS
+        for a in llm_agents
+    )
+    slots = len(llm_agents) if isinstance(agent, ParallelAgent) else 1
+    return max(slots, 1), tokens
+
+
+class _Waiter:
+    def __init__(self, user: str, slots: int, tokens: int):
+        self.user = user
+        self.slots = slots
+        self.tokens = tokens
+        self.future = asyncio.get_running_loop().create_future()
+
+
+class AdmissionController:
+    def __init__(self, max_concurrency: int, tokens_per_minute: int, max_depth: int, max_per_user: int):
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self.max_depth = max_depth
+        self.max_per_user = max_per_user
+        self._queues: "OrderedDict[str, deque[_Waiter]]" = OrderedDict()  # users in round-robin order
+        self._depth = 0
+        self._slots = 0
+        self._reserved = 0
+        self._used: deque[tuple[float, int]] = deque()  # (time, tokens) of finished model calls
+        self._used_total = 0
+        self._run_seconds = INITIAL_RUN_SECONDS
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.admitted = 0
+        self.rejected = 0
+
+    def _window_used(self) -> int:
+        cutoff = time.monotonic() - TOKEN_WINDOW_SECONDS
+        while self._used and self._used[0][0] < cutoff:
+            self._used_total -= self._used.popleft()[1]
+        return self._used_total
+
+    def _fits(self, slots: int, tokens: int) -> bool:
+        if self._slots + slots > self.max_concurrency:
+            return False
+        if not self.tokens_per_minute:
+            return True
+        committed = self._window_used() + self._reserved
+        # A run estimated over the whole budget still goes through once the window is clear
+        return committed + tokens <= self.tokens_per_minute or committed == 0
+
+    def _update_gauges(self):
+        queue_depth.set(self._depth)
+        users_queued.set(len(self._queues))
+        slots_in_flight.set(self._slots)
+        window_tokens.set(self._window_used() + self._reserved)
+
+    def _acquire(self, slots: int, tokens: int):
+        self._slots += slots
+        self._reserved += tokens
+        self.admitted += 1
+
+    def _release(self, slots: int, tokens: int):
+        self._slots -= slots
+        self._reserved -= tokens
+        self._dispatch()
+
+    def _dispatch(self):
+        """Admits waiting runs, one per user in turn, for as long as the next one fits."""
+        while self._queues:
+            user, queue = next(iter(self._queues.items()))
+            waiter = queue[0]
+            if not waiter.future.done() and not self._fits(waiter.slots, waiter.tokens):
+                self._wake_later()
+                break
+            queue.popleft()
+            self._depth -= 1
+            if queue:
+                self._queues.move_to_end(user)
+            else:
+                del self._queues[user]
+            if not waiter.future.done():  # else cancelled while waiting
+                self._acquire(waiter.slots, waiter.tokens)
+                waiter.future.set_result(None)
+        self._update_gauges()
+
+    def _wake_later(self):
+        # Only the token window frees up on its own; released slots dispatch directly
+        if self._timer is not None or not self._used:
+            return
+        delay = max(self._used[0][0] + TOKEN_WINDOW_SECONDS - time.monotonic(), 0.05)
+
+        def wake():
+            self._timer = None
+            self._dispatch()
+
+        self._timer = asyncio.get_running_loop().call_later(delay, wake)
+
+    def _remove(self, waiter: _Waiter):
+        queue = self._queues.get(waiter.user)
+        if queue and waiter in queue:
+            queue.remove(waiter)
+            self._depth -= 1
+            if not queue:
+                del self._queues[waiter.user]
+        # The removed run may have been holding up the ones behind it
+        self._dispatch()
+
+    def retry_after(self) -> int:
+        """Seconds until the runs queued now are likely admitted."""
+        seconds = math.ceil((self._depth + 1) * self._run_seconds / self.max_concurrency)
+        return min(max(seconds, MIN_RETRY_AFTER), MAX_RETRY_AFTER)
+
+    def check(self, user: str):
+        """
+        Raises AdmissionRejected if a run queued for `user` now would be refused.
+        Streaming endpoints call this first, so they can still answer 429 instead of an error event.
+        """
+        if not _rejectable.get():
+            return
+        if self._depth >= self.max_depth:
+            reason, message = "queue_full", f"{self._depth} model runs are already queued; try again shortly"
+        elif len(self._queues.get(user, ())) >= self.max_per_user:
+            reason, message = "user_queue_full", f"You already have {self.max_per_user} model runs queued; try again shortly"
+        else:
+            return
+        self.rejected += 1
+        rejections.inc(reason=reason)
+        raise AdmissionRejected(message, self.retry_after())
+
+    @asynccontextmanager
+    async def admit(self, user: str, slots: int = 1, tokens: int = 0):
+        """Holds `slots` concurrency slots and `tokens` of the budget for the duration of the block."""
+        slots = min(slots, self.max_concurrency)
+        started = time.monotonic()
+        if self._queues or not self._fits(slots, tokens):
+            self.check(user)
+            waiter = _Waiter(user, slots, tokens)
+            self._queues.setdefault(user, deque()).append(waiter)
+            self._depth += 1
+            # Nothing may be in flight to release it, e.g. when only the token window is full
+            self._dispatch()
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                if waiter.future.done() and not waiter.future.cancelled():
+                    self._release(slots, tokens)  # admitted just as it was cancelled
+                else:
+                    waiter.future.cancel()
+                    self._remove(waiter)
+                raise
+        else:
+            self._acquire(slots, tokens)
+            self._update_gauges()
+
+        admitted = time.monotonic()
+        wait_seconds.observe(admitted - started)
+        try:
+            yield
+        finally:
+            self._run_seconds = 0.8 * self._run_seconds + 0.2 * (time.monotonic() - admitted)
+            self._release(slots, tokens)
+
+    def admit_run(self, agent, user: str, message: Content):
+        return self.admit(user, *estimate_run(agent, message))
+
+    def consume(self, tokens: int):
+        """Counts tokens a model call used against the per-minute budget."""
+        if tokens:
+            self._used.append((time.monotonic(), tokens))
+            self._used_total += tokens
+            self._update_gauges()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self._slots,
+            "queued": self._depth,
+            "users_queued": len(self._queues),
+            "window_tokens": self._window_used() + self._reserved,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+
+admission = AdmissionController(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+    max_depth=settings.LLM_QUEUE_MAX_DEPTH,
+    max_per_user=settings.LLM_QUEUE_MAX_PER_USER,
+)
@@ -0,0 +1,185 @@
+"""
+Pluggable model backend for the agents (LLM_BACKEND):
+
+    gemini   the agents' own Gemini models (default)
+    record   Gemini, and every final response is saved as a fixture in LLM_FIXTURES_DIR
+    replay   no model calls: responses come from the fixtures, after a synthetic delay
+
+A fixture is keyed by agent, model and the full request (system instruction
+and contents), so replaying the recorded requests returns exactly what was
+recorded. A request that was never recorded gets another fixture of the same
+agent, in turn, which keeps load tests with fresh inputs offline; with
+LLM_REPLAY_STRICT it is an error instead.
+
+The delay is LLM_REPLAY_LATENCY_MS when set, else the recorded latency times
+LLM_REPLAY_LATENCY_SCALE. Usage metadata is replayed too, so token and cost
+metrics look like the recorded run's.
+"""
+import asyncio
+import hashlib
+import itertools
+import json
+import os
+import threading
+import time
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.models.registry import LLMRegistry
+from google.genai import types
+from pydantic import PrivateAttr
+
+from app.core.config import settings
+
+# Label ADK puts on every model request with the calling agent's name
+AGENT_LABEL = "adk_agent_name"
+
+# Streamed replays send the text in this many partial chunks before the final response
+REPLAY_CHUNKS = 8
+
+
+class FixtureNotFound(Exception):
+    pass
+
+
+def _agent_name(llm_request: LlmRequest) -> str:
+    labels = (llm_request.config.labels if llm_request.config else None) or {}
+    return labels.get(AGENT_LABEL, "unknown")
+
+
+def request_key(llm_request: LlmRequest) -> str:
+    config = llm_request.config
+    payload = json.dumps({
+        "agent": _agent_name(llm_request),
+        "model": llm_request.model,
+        "system_instruction": str(config.system_instruction) if config and config.system_instruction else None,
+        "contents": [content.model_dump(mode="json", exclude_none=True) for content in llm_request.contents],
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class FixtureStore:
+    """Fixtures as JSON files, one directory per agent: <root>/<agent>/<request key>.json."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+        self._by_agent: dict[str, list[dict]] = {}
+        self._by_key: dict[str, dict] = {}
+        self._cycles: dict[str, itertools.cycle] = {}
+        self._loaded = False
+
+    def _load(self):
+        with self._lock:
+            if self._loaded:
+                return
+            if os.path.isdir(self.root):
+                for agent in sorted(os.listdir(self.root)):
+                    directory = os.path.join(self.root, agent)
+                    for name in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+                        with open(os.path.join(directory, name)) as f:
+                            fixture = json.load(f)
+                        self._by_agent.setdefault(agent, []).append(fixture)
+                        self._by_key[fixture["key"]] = fixture
+            self._cycles = {agent: itertools.cycle(fixtures) for agent, fixtures in self._by_agent.items()}
+            self._loaded = True
+
+    def find(self, key: str, agent: str, strict: bool) -> dict:
+        self._load()
+        fixture = self._by_key.get(key)
+        if fixture is not None:
+            return fixture
+        if strict or agent not in self._cycles:
+            raise FixtureNotFound(
+                f"No recorded response for {agent} (key {key[:12]}) in {self.root}; record one with LLM_BACKEND=record"
+            )
+        with self._lock:
+            return next(self._cycles[agent])
+
+    def save(self, fixture: dict):
+        directory = os.path.join(self.root, fixture["agent"])
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{fixture['key']}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(fixture, f, indent=2)
+        os.replace(tmp_path, path)
+
+
+fixtures = FixtureStore(settings.LLM_FIXTURES_DIR)
+
+
+def _usage_dict(usage: Optional[types.GenerateContentResponseUsageMetadata]) -> Optional[dict]:
+    return usage.model_dump(mode="json", exclude_none=True) if usage else None
+
+
+class RecordingLlm(BaseLlm):
+    """Calls the real model and saves each final response as a fixture."""
+
+    _inner: BaseLlm = PrivateAttr()
+
+    def model_post_init(self, __context):
+        self._inner = LLMRegistry.new_llm(self.model)
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        key = request_key(llm_request)
+        started = time.perf_counter()
+        async for response in self._inner.generate_content_async(llm_request, stream=stream):
+            if not response.partial and response.content:
+                fixtures.save({
+                    "key": key,
+                    "agent": _agent_name(llm_request),
+                    "model": self.model,
+                    "latency_ms": round((time.perf_counter() - started) * 1000),
+                    "text": "".join(part.text or "" for part in response.content.parts or []),
+                    "usage": _usage_dict(response.usage_metadata),
+                })
+            yield response
+
+
+class ReplayLlm(BaseLlm):
+    """Answers from recorded fixtures after a synthetic delay; never calls a model."""
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        fixture = fixtures.find(request_key(llm_request), _agent_name(llm_request), settings.LLM_REPLAY_STRICT)
+        if settings.LLM_REPLAY_LATENCY_MS is not None:
+            delay = settings.LLM_REPLAY_LATENCY_MS / 1000
+        else:
+            delay = fixture["latency_ms"] * settings.LLM_REPLAY_LATENCY_SCALE / 1000
+
+        text = fixture["text"]
+        if stream:
+            size = max(1, -(-len(text) // REPLAY_CHUNKS))
+            for start in range(0, len(text), size):
+                await asyncio.sleep(delay / REPLAY_CHUNKS)
+                yield LlmResponse(
+                    content=types.Content(role="model", parts=[types.Part(text=text[start:start + size])]),
+                    partial=True,
+                )
+        else:
+            await asyncio.sleep(delay)
+        usage = fixture.get("usage")
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            model_version=self.model,
+            usage_metadata=types.GenerateContentResponseUsageMetadata(**usage) if usage else None,
+        )
+
+
+BACKENDS = {"record": RecordingLlm, "replay": ReplayLlm}
+
+
+def install(agent):
+    """Puts every LLM agent in the tree on the LLM_BACKEND model; a no-op for "gemini"."""
+    backend = BACKENDS.get(settings.LLM_BACKEND)
+    if backend is None:
+        return agent
+    if isinstance(agent, LlmAgent):
+        model = agent.model if isinstance(agent.model, str) else agent.model.model
+        agent.model = backend(model=model)
+    for sub_agent in agent.sub_agents:
+        install(sub_agent)
+    return agent
@@ -0,0 +1,175 @@
+"""
+Accounting for model calls: latency, tokens, cost, failures and retries,
+labeled by agent, model and endpoint, exported on GET /metrics.
+
+MetricsPlugin is installed on every runner. Endpoints name themselves with
+set_endpoint(); code that wants a per-request summary (a generation) calls
+track() first and reads the returned UsageSummary afterwards. Both are
+context variables, so they follow the request into the tasks it starts.
+"""
+import contextvars
+import threading
+import time
+from typing import Optional
+
+from google.adk.plugins.base_plugin import BasePlugin
+
+from app.services.llm_admission import admission
+from app.services.metrics import registry
+
+# USD per million tokens (input, output) at standard rates for prompts up to 200k tokens.
+# Thinking tokens are billed as output.
+MODEL_PRICES = {
+    "gemini-2.5-pro": (1.25, 10.00),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+}
+
+LABELS = ("agent", "model", "endpoint")
+
+# Failed runs never reach after_run_callback; past this many tracked calls the oldest are forgotten
+MAX_TRACKED_CALLS = 1000
+
+llm_requests = registry.counter("llm_requests_total", "Model calls by outcome (success or error).", (*LABELS, "outcome"))
+llm_latency = registry.histogram("llm_request_duration_seconds", "Model call latency up to the final response.", LABELS)
+llm_tokens = registry.counter("llm_tokens_total", "Tokens from model usage metadata (input or output).", (*LABELS, "type"))
+llm_retries = registry.counter("llm_retries_total", "Model calls an agent made again after a failed call in the same run.", LABELS)
+llm_cost = registry.counter("llm_cost_usd_total", "Estimated model cost in USD (MODEL_PRICES).", LABELS)
+
+_endpoint: contextvars.ContextVar[str] = contextvars.ContextVar("llm_endpoint", default="other")
+_usage: contextvars.ContextVar[Optional["UsageSummary"]] = contextvars.ContextVar("llm_usage", default=None)
+
+
+def set_endpoint(name: str):
+    _endpoint.set(name)
+
+
+def cost_usd(model: str, input_tokens: int, output_tokens: int) -> Optional[float]:
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        return None
+    return (input_tokens * prices[0] + output_tokens * prices[1]) / 1_000_000
+
+
+class UsageSummary:
+    """Per-agent totals for the model calls made while it is being tracked."""
+
+    def __init__(self):
+        self._agents: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, agent: str, model: str, seconds: float, input_tokens: int, output_tokens: int,
+               cost: Optional[float], failed: bool):
+        with self._lock:
+            entry = self._agents.setdefault(agent, {
+                "model": model, "calls": 0, "failures": 0, "latency_ms": 0,
+                "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0,
+            })
+            entry["calls"] += 1
+            entry["failures"] += int(failed)
+            entry["latency_ms"] += round(seconds * 1000)
+            entry["input_tokens"] += input_tokens
+            entry["output_tokens"] += output_tokens
+            entry["cost_usd"] = round(entry["cost_usd"] + (cost or 0.0), 6)
+
+    def merge(self, other: "UsageSummary"):
+        with other._lock:
+            agents = {name: dict(entry) for name, entry in other._agents.items()}
+        with self._lock:
+            for name, entry in agents.items():
+                mine = self._agents.setdefault(name, {**entry, "calls": 0, "failures": 0, "latency_ms": 0,
+                                                      "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0})
+                for key in ("calls", "failures", "latency_ms", "input_tokens", "output_tokens"):
+                    mine[key] += entry[key]
+                mine["cost_usd"] = round(mine["cost_usd"] + entry["cost_usd"], 6)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            agents = {name: dict(entry) for name, entry in self._agents.items()}
+        totals = {key: sum(entry[key] for entry in agents.values())
+                  for key in ("calls", "failures", "latency_ms", "input_tokens", "output_tokens")}
+        totals["cost_usd"] = round(sum(entry["cost_usd"] for entry in agents.values()), 6)
+        return {"agents": agents, "total": totals}
+
+
+def track() -> UsageSummary:
+    """Starts collecting a summary of the model calls made from the current context on."""
+    summary = UsageSummary()
+    _usage.set(summary)
+    return summary
+
+
+def charge(summary: UsageSummary):
+    """Adds model calls tracked in another context (a shared run) to the current context's summary."""
+    current = _usage.get()
+    if current is not None:
+        current.merge(summary)
+
+
+class MetricsPlugin(BasePlugin):
+    def __init__(self):
+        super().__init__(name="llm_metrics")
+        # (invocation, agent) -> (start time, model); agents of a ParallelAgent call the model concurrently
+        self._started: dict[tuple[str, str], tuple[float, str]] = {}
+        self._failed: dict[tuple[str, str], None] = {}  # insertion-ordered set
+
+    def _finish(self, key: tuple[str, str], input_tokens: int = 0, output_tokens: int = 0, failed: bool = False,
+                served_model: Optional[str] = None):
+        started = self._started.pop(key, None)
+        if started is None:
+            return
+        seconds = time.perf_counter() - started[0]
+        # A hedged or routed call (model_routing) may have been answered by another model than requested
+        model = served_model or started[1]
+        labels = {"agent": key[1], "model": model, "endpoint": _endpoint.get()}
+        cost = cost_usd(model, input_tokens, output_tokens)
+
+        llm_requests.inc(**labels, outcome="error" if failed else "success")
+        llm_latency.observe(seconds, **labels)
+        llm_tokens.inc(input_tokens, **labels, type="input")
+        llm_tokens.inc(output_tokens, **labels, type="output")
+        if cost is not None:
+            llm_cost.inc(cost, **labels)
+        admission.consume(input_tokens + output_tokens)
+        summary = _usage.get()
+        if summary is not None:
+            summary.record(key[1], model, seconds, input_tokens, output_tokens, cost, failed)
+
+    async def before_model_callback(self, *, callback_context, llm_request):
+        key = (callback_context.invocation_id, callback_context.agent_name)
+        if key in self._failed:
+            llm_retries.inc(agent=key[1], model=llm_request.model or "", endpoint=_endpoint.get())
+        self._started[key] = (time.perf_counter(), llm_request.model or "")
+        for tracked in (self._started, self._failed):
+            while len(tracked) > MAX_TRACKED_CALLS:
+                del tracked[next(iter(tracked))]
+        return None
+
+    async def after_model_callback(self, *, callback_context, llm_response):
+        # Streaming calls report each chunk; usage metadata comes with the final one
+        if llm_response.partial:
+            return None
+        usage = llm_response.usage_metadata
+        input_tokens = (usage.prompt_token_count or 0) if usage else 0
+        output_tokens = ((usage.candidates_token_count or 0) + (usage.thoughts_token_count or 0)) if usage else 0
+        served_model = (llm_response.custom_metadata or {}).get("served_model")
+        self._finish((callback_context.invocation_id, callback_context.agent_name), input_tokens, output_tokens,
+                     served_model=served_model)
+        return None
+
+    async def on_model_error_callback(self, *, callback_context, llm_request, error):
+        key = (callback_context.invocation_id, callback_context.agent_name)
+        self._failed[key] = None
+        self._finish(key, failed=True)
+        return None
+
+    async def after_run_callback(self, *, invocation_context):
+        # The run is over, so its calls can no longer be retried
+        invocation_id = invocation_context.invocation_id
+        for key in [k for k in self._started if k[0] == invocation_id]:
+            del self._started[key]
+        for key in [k for k in self._failed if k[0] == invocation_id]:
+            del self._failed[key]
+
+
+metrics_plugin = MetricsPlugin()
@@ -0,0 +1,181 @@
+"""
+Latency budgets, hedged requests and small-input routing for the pipeline agents.
+
+HedgedLlm sits in front of an agent's own model (the primary) and FAST_MODEL:
+
+- When the primary hasn't answered within the stage's latency budget, or fails
+  before then, the same request also goes to the fast model. The first final
+  response that validates against the agent's output schema wins and the other
+  call is cancelled; an invalid one leaves the other call running. Streamed
+  partial text is forwarded from the primary until the hedge starts.
+- Inside fast_route(True), which the pipeline enters for small inputs, the
+  fast model is called directly.
+
+Responses name the model that served them in model_version, and in
+custom_metadata as {"served_model", "route"}, route being "primary", "hedge"
+or "fast". The session events carry both, so the pipeline can record them.
+"""
+import asyncio
+import contextlib
+import contextvars
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.models.registry import LLMRegistry
+from pydantic import BaseModel, PrivateAttr, ValidationError
+
+from app.core.config import settings
+from app.services.llm_backend import AGENT_LABEL
+from app.services.metrics import registry
+
+hedges = registry.counter(
+    "llm_hedges_total", "Hedged model calls by the route that answered (primary, hedge or failed).", ("agent", "winner")
+)
+
+_fast_route: contextvars.ContextVar[bool] = contextvars.ContextVar("llm_fast_route", default=False)
+
+
+@contextlib.contextmanager
+def fast_route(enabled: bool):
+    """Sends the model calls made inside the block straight to FAST_MODEL."""
+    token = _fast_route.set(enabled)
+    try:
+        yield
+    finally:
+        _fast_route.reset(token)
+
+
+def _valid(response: LlmResponse, llm_request: LlmRequest) -> bool:
+    schema = llm_request.config.response_schema if llm_request.config else None
+    if not (isinstance(schema, type) and issubclass(schema, BaseModel)):
+        return True
+    text = "".join(part.text or "" for part in (response.content.parts if response.content else None) or [])
+    try:
+        schema.model_validate_json(text)
+        return True
+    except ValidationError:
+        return False
+
+
+def _served(response: LlmResponse, model: str, route: str) -> LlmResponse:
+    response.model_version = response.model_version or model
+    response.custom_metadata = {**(response.custom_metadata or {}), "served_model": model, "route": route}
+    return response
+
+
+class HedgedLlm(BaseLlm):
+    """The primary model, hedged with the fast model past budget_seconds (None: never)."""
+
+    _primary: BaseLlm = PrivateAttr()
+    _fast: BaseLlm = PrivateAttr()
+    _budget_seconds: Optional[float] = PrivateAttr(default=None)
+
+    @classmethod
+    def wrap(cls, primary: BaseLlm, fast_model: str, budget_seconds: Optional[float]) -> "HedgedLlm":
+        llm = cls(model=primary.model)
+        llm._primary = primary
+        # Same backend as the primary (Gemini, record or replay), on the fast model
+        llm._fast = type(primary)(model=fast_model)
+        llm._budget_seconds = budget_seconds
+        return llm
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        if _fast_route.get():
+            llm_request.model = self._fast.model
+            async for response in self._fast.generate_content_async(llm_request, stream=stream):
+                yield _served(response, self._fast.model, "fast")
+            return
+        if self._budget_seconds is None:
+            async for response in self._primary.generate_content_async(llm_request, stream=stream):
+                yield _served(response, self._primary.model, "primary")
+            return
+
+        # Models mutate the request they are given, so the hedge gets a copy taken up front
+        hedge_request = llm_request.model_copy(deep=True)
+        hedge_request.model = self._fast.model
+        agent = (llm_request.config.labels or {}).get(AGENT_LABEL, "unknown") if llm_request.config else "unknown"
+        queue: asyncio.Queue = asyncio.Queue()
+
+        models = {"primary": self._primary, "hedge": self._fast}
+
+        async def consume(route: str, request: LlmRequest):
+            try:
+                async for response in models[route].generate_content_async(request, stream=stream):
+                    await queue.put((route, response))
+                await queue.put((route, None))
+            except Exception as e:
+                await queue.put((route, e))
+
+        tasks = {"primary": asyncio.create_task(consume("primary", llm_request))}
+        deadline = asyncio.get_running_loop().time() + self._budget_seconds
+        hedged = False
+        error: Optional[Exception] = None
+        fallback: Optional[LlmResponse] = None
+        try:
+            while tasks:
+                if hedged:
+                    route, item = await queue.get()
+                else:
+                    try:
+                        route, item = await asyncio.wait_for(queue.get(), deadline - asyncio.get_running_loop().time())
+                    except asyncio.TimeoutError:
+                        print(f"{agent}: {self._primary.model} over its {self._budget_seconds}s budget, "
+                              f"hedging with {self._fast.model}")
+                        tasks["hedge"] = asyncio.create_task(consume("hedge", hedge_request))
+                        hedged = True
+                        continue
+
+                if route not in tasks:
+                    continue  # the rest of a call already given up on
+                model = models[route].model
+                if isinstance(item, LlmResponse) and item.partial:
+                    if not hedged:
+                        yield _served(item, model, route)
+                    continue
+                if isinstance(item, LlmResponse) and _valid(item, llm_request):
+                    if hedged:
+                        hedges.inc(agent=agent, winner=route)
+                    yield _served(item, model, route)
+                    return
+
+                # This call failed, ended without a response, or answered with an invalid one
+                tasks.pop(route).cancel()
+                if isinstance(item, Exception):
+                    error = error or item
+                elif item is not None:
+                    fallback = fallback or _served(item, model, route)
+                if not hedged:
+                    print(f"{agent}: {self._primary.model} failed, falling back to {self._fast.model}")
+                    tasks["hedge"] = asyncio.create_task(consume("hedge", hedge_request))
+                    hedged = True
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+        hedges.inc(agent=agent, winner="failed")
+        if fallback is not None:
+            # Nothing valid came back; the agent reports the schema error as it would without hedging
+            yield fallback
+        elif error is not None:
+            raise error
+
+
+def install(agent, budget_seconds: Optional[float]):
+    """
+    Wraps every LLM agent in the tree that isn't on FAST_MODEL already in a HedgedLlm.
+    Call after llm_backend.install, so both models use the configured backend.
+    A no-op while there is neither a budget nor fast routing.
+    """
+    if budget_seconds is None and not settings.FAST_ROUTE_MAX_TOKENS:
+        return agent
+    if (isinstance(agent, LlmAgent) and not isinstance(agent.model, HedgedLlm)
+            and agent.canonical_model.model != settings.FAST_MODEL):
+        primary = agent.model if isinstance(agent.model, BaseLlm) else LLMRegistry.new_llm(agent.model)
+        agent.model = HedgedLlm.wrap(primary, settings.FAST_MODEL, budget_seconds)
+    for sub_agent in agent.sub_agents:
+        install(sub_agent, budget_seconds)
+    return agent
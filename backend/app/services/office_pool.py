@@ -0,0 +1,259 @@
+"""
+Pool of long-lived headless LibreOffice workers used for DOCX -> PDF conversion.
+
+Each worker is an `unoserver` process that keeps one soffice instance warm and
+accepts conversions over XML-RPC, so a conversion no longer pays for process
+startup. Every worker gets its own LibreOffice user profile so concurrent
+workers never fight over the same profile directory.
+
+Profiles live in a per-process directory, and workers take free ports unless
+OFFICE_POOL_BASE_PORT fixes them, so several server processes can each run a
+pool. A conversion whose worker died is retried once on another worker.
+"""
+import os
+import queue
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import xmlrpc.client
+from typing import Optional
+
+from app.core.config import settings
+
+
+class OfficePoolTimeout(Exception):
+    """Raised when no worker becomes free within the queue timeout."""
+
+
+class _TimeoutTransport(xmlrpc.client.Transport):
+    """XML-RPC transport with a socket timeout, so a hung soffice cannot block a request forever."""
+
+    def __init__(self, timeout: float):
+        super().__init__()
+        self.timeout = timeout
+
+    def make_connection(self, host):
+        connection = super().make_connection(host)
+        connection.timeout = self.timeout
+        return connection
+
+
+def _free_port() -> int:
+    """A port that is free right now, picked by the OS."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class OfficeWorker:
+    def __init__(self, worker_id: int, base_dir: str, port: Optional[int] = None, uno_port: Optional[int] = None):
+        self.worker_id = worker_id
+        self.fixed_ports = port is not None
+        self.port = port
+        self.uno_port = uno_port
+        self.profile_dir = os.path.join(base_dir, f"worker-{worker_id}")
+        self.process: Optional[subprocess.Popen] = None
+        self.conversions = 0
+
+    def start(self):
+        """
+        Starts the unoserver process with an isolated user profile and waits until it accepts connections.
+        Without fixed ports, every start takes fresh free ones.
+        """
+        if not self.fixed_ports:
+            self.port, self.uno_port = _free_port(), _free_port()
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+        os.makedirs(self.profile_dir, exist_ok=True)
+        cmd = [
+            settings.OFFICE_SERVER_BINARY,
+            "--interface", "127.0.0.1",
+            "--port", str(self.port),
+            "--uno-port", str(self.uno_port),
+            "--user-installation", self.profile_dir,
+        ]
+        self.process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.conversions = 0
+
+        deadline = time.monotonic() + settings.OFFICE_WORKER_STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.is_healthy():
+                print(f"Office worker {self.worker_id} ready on port {self.port}")
+                return
+            if self.process.poll() is not None:
+                break
+            time.sleep(0.25)
+        self.stop()
+        raise Exception(f"Office worker {self.worker_id} failed to start")
+
+    def is_healthy(self) -> bool:
+        """A worker is healthy when its process is alive and its XML-RPC port accepts connections."""
+        if self.process is None or self.process.poll() is not None:
+            return False
+        try:
+            with socket.create_connection(("127.0.0.1", self.port), timeout=1):
+                return True
+        except OSError:
+            return False
+
+    def convert(self, docx_path: str, pdf_path: str):
+        proxy = xmlrpc.client.ServerProxy(
+            f"http://127.0.0.1:{self.port}",
+            allow_none=True,
+            transport=_TimeoutTransport(settings.OFFICE_CONVERSION_TIMEOUT),
+        )
+        proxy.convert(docx_path, None, pdf_path, "pdf")
+        self.conversions += 1
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+
+class OfficeWorkerPool:
+    def __init__(self, size: int, max_conversions: int, queue_timeout: float):
+        self.size = size
+        self.max_conversions = max_conversions
+        self.queue_timeout = queue_timeout
+        # Per process: another server process's pool must not wipe these profiles
+        self.base_dir = os.path.join(tempfile.gettempdir(), f"office-pool-{os.getpid()}")
+        self._workers: list[OfficeWorker] = []
+        self._idle: "queue.Queue[OfficeWorker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = False
+        self.recycled = 0
+        self.total_conversions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0 and shutil.which(settings.OFFICE_SERVER_BINARY) is not None
+
+    def _ensure_started(self):
+        # Workers are started lazily so the API can boot on machines without LibreOffice.
+        if self._started:
+            return
+        with self._lock:
+            if self._started:
+                return
+            workers = []
+            try:
+                base_port = settings.OFFICE_POOL_BASE_PORT
+                for i in range(self.size):
+                    worker = OfficeWorker(
+                        worker_id=i,
+                        base_dir=self.base_dir,
+                        port=base_port + 2 * i if base_port else None,
+                        uno_port=base_port + 2 * i + 1 if base_port else None,
+                    )
+                    workers.append(worker)
+                    worker.start()
+            except Exception:
+                # Free the ports of the workers that did start, so the next attempt can bind them
+                for worker in workers:
+                    worker.stop()
+                raise
+            self._workers = workers
+            for worker in workers:
+                self._idle.put(worker)
+            self._started = True
+
+    def _recycle(self, worker: OfficeWorker):
+        """Replaces a worker's process with a fresh one, keeping its ports and slot in the pool."""
+        worker.stop()
+        self.recycled += 1
+        worker.start()
+
+    def _checkout(self) -> OfficeWorker:
+        """
+        Takes the next free worker, restarting it first if it was stopped or has died.
+        Idle workers are either healthy or stopped, never half-broken.
+        """
+        try:
+            worker = self._idle.get(timeout=self.queue_timeout)
+        except queue.Empty:
+            raise OfficePoolTimeout(f"No PDF worker became available within {self.queue_timeout}s")
+        if worker.is_healthy():
+            return worker
+        print(f"Office worker {worker.worker_id} is not running, restarting")
+        try:
+            self._recycle(worker)
+        except Exception:
+            # start() leaves it stopped; the next checkout tries again
+            self._idle.put(worker)
+            raise
+        return worker
+
+    def _recycle_in_background(self, worker: OfficeWorker):
+        def run():
+            try:
+                self._recycle(worker)
+            except Exception as e:
+                print(f"Office worker {worker.worker_id} failed to restart: {e}")
+            if worker in self._workers:
+                self._idle.put(worker)
+            else:
+                worker.stop()  # the pool was shut down meanwhile
+
+        threading.Thread(target=run, name=f"office-recycle-{worker.worker_id}", daemon=True).start()
+
+    def convert(self, docx_path: str, pdf_path: str, retry: bool = True):
+        """
+        Converts `docx_path` to `pdf_path` on the next free worker.
+        Waits up to `queue_timeout` seconds for a worker before raising OfficePoolTimeout.
+        When the worker turns out to be dead (soffice crashed since its checkout), the conversion
+        is retried once on another worker, restarted if need be.
+        """
+        self._ensure_started()
+        worker = self._checkout()
+        try:
+            worker.convert(docx_path, pdf_path)
+            self.total_conversions += 1
+        except Exception:
+            died = not worker.is_healthy()
+            # The conversion may have crashed soffice; stop it so the next checkout restarts it.
+            print(f"Office worker {worker.worker_id} failed a conversion, stopping it")
+            worker.stop()
+            self._idle.put(worker)
+            if died and retry:
+                print(f"Office worker {worker.worker_id} had died, retrying the conversion once")
+                return self.convert(docx_path, pdf_path, retry=False)
+            raise
+        if worker.conversions >= self.max_conversions:
+            # Restart off the request path; the pool is one worker short until it is back
+            self._recycle_in_background(worker)
+        else:
+            self._idle.put(worker)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "started": self._started,
+            "idle": self._idle.qsize(),
+            "recycled": self.recycled,
+            "conversions": self.total_conversions,
+        }
+
+    def shutdown(self):
+        with self._lock:
+            for worker in self._workers:
+                worker.stop()
+            self._workers = []
+            self._idle = queue.Queue()
+            self._started = False
+            shutil.rmtree(self.base_dir, ignore_errors=True)
+
+
+office_pool = OfficeWorkerPool(
+    size=settings.OFFICE_POOL_SIZE,
+    max_conversions=settings.OFFICE_WORKER_MAX_CONVERSIONS,
+    queue_timeout=settings.OFFICE_POOL_QUEUE_TIMEOUT,
+)
@@ -0,0 +1,173 @@
+"""
+Native PDF backend for the built-in templates.
+
+Lays resume_data out directly to PDF with PyMuPDF's HTML/CSS engine (Story),
+using the same LAYOUT values the DOCX generators compile into their style
+sheets, so PDF export no longer needs the DOCX -> LibreOffice round trip.
+"""
+import hashlib
+import html
+import io
+import os
+
+import pymupdf
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+# Hash of this module's source, so cached native PDFs go stale when the renderer changes
+with open(__file__, "rb") as _source:
+    VERSION = hashlib.sha256(_source.read()).hexdigest()
+
+# Line spacing as a multiple of font size; the layout estimator measures with the same value
+LINE_HEIGHT = 1.2
+
+# python-docx's default template is US Letter
+PAGE_RECT = pymupdf.paper_rect("letter")
+
+# Metric-compatible free fonts for the Office fonts the templates use.
+# Arial maps to MuPDF's built-in Helvetica clone, which needs no file.
+FONT_FILES = {
+    "Calibri": {
+        "dir": "/usr/share/fonts/truetype/crosextra",
+        "faces": {
+            ("normal", "normal"): "Carlito-Regular.ttf",
+            ("bold", "normal"): "Carlito-Bold.ttf",
+            ("normal", "italic"): "Carlito-Italic.ttf",
+            ("bold", "italic"): "Carlito-BoldItalic.ttf",
+        },
+    },
+}
+
+CSS_ALIGNMENT = {
+    WD_ALIGN_PARAGRAPH.LEFT: "left",
+    WD_ALIGN_PARAGRAPH.CENTER: "center",
+    WD_ALIGN_PARAGRAPH.RIGHT: "right",
+    WD_ALIGN_PARAGRAPH.JUSTIFY: "justify",
+}
+
+
+def _font_setup(font: str):
+    """Returns (css font-family, @font-face rules, archive) for the template font."""
+    spec = FONT_FILES.get(font)
+    if spec and all(os.path.exists(os.path.join(spec["dir"], f)) for f in spec["faces"].values()):
+        faces = "".join(
+            f"@font-face {{font-family: resume; font-weight: {weight}; font-style: {style}; src: url({name});}}"
+            for (weight, style), name in spec["faces"].items()
+        )
+        return "resume", faces, pymupdf.Archive(spec["dir"])
+    return "sans-serif", "", None
+
+
+def _css(layout: dict, family: str, font_faces: str) -> str:
+    return f"""
+    {font_faces}
+    * {{ font-family: {family}; font-size: {layout['body_size']}pt; line-height: {LINE_HEIGHT}; margin: 0; padding: 0; }}
+    p {{ margin: 0; }}
+    .name {{ font-size: {layout['name_size']}pt; font-weight: bold; text-align: {CSS_ALIGNMENT[layout['header_alignment']]}; }}
+    .contact {{ text-align: {CSS_ALIGNMENT[layout['header_alignment']]}; margin-bottom: {layout['contact_space_after']}pt; }}
+    .heading {{
+        font-size: {layout['heading_size']}pt; font-weight: bold;
+        margin-top: {layout['heading_space_before']}pt; margin-bottom: {layout['heading_space_after']}pt;
+        border-bottom: {layout['heading_border_eighths'] / 8}pt solid black; padding-bottom: 1pt;
+    }}
+    .body {{ text-align: justify; }}
+    .entry {{ margin-top: {layout['entry_space_before']}pt; margin-bottom: {layout['entry_space_after']}pt; }}
+    .education {{ margin-top: {layout['education_space']}pt; margin-bottom: {layout['education_space']}pt; }}
+    ul {{ margin: 0; padding-left: 18pt; }}
+    li {{ text-align: justify; }}
+    """
+
+
+def _e(value) -> str:
+    return html.escape(str(value or ""))
+
+
+def build_html(resume_data: dict) -> str:
+    """Mirrors the section order and content of the DOCX generators."""
+    parts = []
+    basic_info = resume_data.get("basic_info", {})
+    parts.append(f"<p class='name'>{_e(basic_info.get('first_name'))} {_e(basic_info.get('last_name'))}</p>")
+
+    contact_info = []
+    addr = basic_info.get("address")
+    if isinstance(addr, dict):
+        location = ", ".join(p for p in [addr.get('city'), addr.get('state')] if p)
+        if location:
+            contact_info.append(location)
+    for field in ("email", "phone"):
+        if basic_info.get(field):
+            contact_info.append(basic_info[field])
+    if basic_info.get("linkedin_profile"):
+        contact_info.append("LinkedIn")
+    parts.append(f"<p class='contact'>{' | '.join(_e(c) for c in contact_info)}</p>")
+
+    def heading(text):
+        parts.append(f"<p class='heading'>{_e(text)}</p>")
+
+    def bullets(items):
+        if items:
+            parts.append("<ul>" + "".join(f"<li>{_e(item)}</li>" for item in items) + "</ul>")
+
+    if resume_data.get("about"):
+        heading("SUMMARY")
+        parts.append(f"<p class='body'>{_e(resume_data['about'])}</p>")
+
+    if resume_data.get("skills"):
+        heading("TECHNICAL PROFICIENCIES")
+        for group in resume_data["skills"]:
+            skills = ", ".join(group.get("skills", []))
+            parts.append(f"<p><b>{_e(group.get('category', 'Skills'))}: </b>{_e(skills)}</p>")
+
+    if resume_data.get("experience"):
+        heading("WORK EXPERIENCE")
+        for exp in resume_data["experience"]:
+            parts.append(
+                f"<p class='entry'><b>{_e(exp.get('company_name'))} - {_e(exp.get('job_title'))}</b>"
+                f"<i> | {_e(exp.get('start_date'))} - {_e(exp.get('end_date'))}</i></p>"
+            )
+            bullets(exp.get("description", []))
+
+    if resume_data.get("projects"):
+        heading("PROJECTS")
+        for project in resume_data["projects"]:
+            parts.append(f"<p class='entry'><b>{_e(project.get('name'))}</b></p>")
+            bullets(project.get("description", []))
+
+    if resume_data.get("education"):
+        heading("EDUCATION")
+        for edu in resume_data["education"]:
+            parts.append(
+                f"<p class='education'><b>{_e(edu.get('school_name'))} | {_e(edu.get('degree'))}</b>"
+                f" | {_e(edu.get('start_date'))} - {_e(edu.get('end_date'))}</p>"
+            )
+
+    if resume_data.get("awards"):
+        heading("ACHIEVEMENTS")
+        parts.append("<ul>" + "".join(
+            f"<li><b>{_e(award.get('name'))}: </b>{_e(award.get('description'))}</li>"
+            for award in resume_data["awards"]
+        ) + "</ul>")
+
+    return "".join(parts)
+
+
+def render_pdf(resume_data: dict, layout: dict) -> bytes:
+    """Renders resume_data to PDF bytes using a template's LAYOUT."""
+    family, font_faces, archive = _font_setup(layout["font"])
+    story = pymupdf.Story(html=build_html(resume_data), user_css=_css(layout, family, font_faces), archive=archive)
+
+    margin = layout["margin_inches"] * 72
+    content_rect = PAGE_RECT + (margin, margin, -margin, -margin)
+    buffer = io.BytesIO()
+    writer = pymupdf.DocumentWriter(buffer)
+    more = True
+    while more:
+        device = writer.begin_page(PAGE_RECT)
+        more, _ = story.place(content_rect)
+        story.draw(device)
+        writer.end_page()
+    writer.close()
+
+    # Embed only the glyphs actually used
+    document = pymupdf.open(stream=buffer.getvalue(), filetype="pdf")
+    document.subset_fonts()
+    return document.tobytes(garbage=3, deflate=True)
@@ -0,0 +1,150 @@
+"""
+Relevance pre-ranking of profile items, so the resume agent's input stays
+bounded however long the source profile is.
+
+Experience, projects, publications, certifications and awards are indexed
+with BM25 and scored against the job description plus the ATS keywords
+(keywords count double). For a page-limited resume_length, only the top-K
+items per section are sent, K growing with the page budget; the rest are
+listed by name in ResumeInput.omitted_items. Open-ended lengths ("4+ pages")
+send everything. Kept items stay in their original order.
+
+The index only depends on the profile, so the last few are kept: a batch of
+job descriptions against one profile analyzes its items once.
+"""
+import hashlib
+import json
+import math
+import threading
+from collections import Counter, OrderedDict
+from typing import Optional
+
+from app.services import keyword_extractor
+from app.services.layout_estimator import target_pages
+
+# Items kept per page of the resume_length budget
+ITEMS_PER_PAGE = {
+    "experience": 5,
+    "projects": 3,
+    "publications": 3,
+    "certification": 4,
+    "awards": 3,
+}
+
+# ATS keywords weigh this many times a word of the job description
+KEYWORD_WEIGHT = 2
+
+# Omitted items named per section; the rest are only counted, so the note stays bounded too
+MAX_OMITTED_LABELS = 10
+
+# Profile indexes kept for reuse
+INDEX_CACHE_SIZE = 32
+
+
+def _item_text(section: str, item: dict) -> str:
+    fields = {
+        "experience": ("job_title", "company_name", "description"),
+        "projects": ("name", "description"),
+        "publications": ("name", "publisher", "description"),
+        "certification": ("name", "issuer", "description"),
+        "awards": ("name", "issuer", "description"),
+    }[section]
+    parts = []
+    for field in fields:
+        value = item.get(field) or ""
+        parts.extend(value if isinstance(value, list) else [value])
+    return " ".join(parts)
+
+
+def _label(section: str, item: dict) -> str:
+    if section == "experience":
+        dates = "-".join(d for d in (item.get("start_date"), item.get("end_date")) if d)
+        label = f"{item.get('job_title') or ''} at {item.get('company_name') or ''}"
+        return f"{label} ({dates})" if dates else label
+    return item.get("name") or ""
+
+
+class BM25:
+    """Okapi BM25 over tokenized documents (non-negative idf, so terms in every document still count a little)."""
+
+    def __init__(self, documents: list[list[str]], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.term_counts = [Counter(doc) for doc in documents]
+        self.lengths = [len(doc) for doc in documents]
+        self.avg_length = sum(self.lengths) / len(documents) if documents else 0
+        doc_freq = Counter(term for counts in self.term_counts for term in counts)
+        n = len(documents)
+        self.idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items()}
+
+    def scores(self, query: Counter) -> list[float]:
+        scores = []
+        for counts, length in zip(self.term_counts, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / self.avg_length) if self.avg_length else self.k1
+            scores.append(sum(
+                weight * self.idf[term] * counts[term] * (self.k1 + 1) / (counts[term] + norm)
+                for term, weight in query.items() if term in counts
+            ))
+        return scores
+
+
+_index_cache: "OrderedDict[str, tuple[list, BM25]]" = OrderedDict()
+_index_lock = threading.Lock()
+
+
+def _index(profile: dict, sections: list[str]) -> tuple[list, BM25]:
+    """(section, position, item) for every item in the sections, and one BM25 index over them all."""
+    key = hashlib.sha256(json.dumps(
+        {section: profile[section] for section in sections}, sort_keys=True, default=str
+    ).encode()).hexdigest()
+    with _index_lock:
+        if key in _index_cache:
+            _index_cache.move_to_end(key)
+            return _index_cache[key]
+
+    # One index across all ranked sections, so idf reflects the whole profile
+    items = [(section, i, item) for section in sections for i, item in enumerate(profile[section])]
+    index = BM25([keyword_extractor.analyze(_item_text(section, item)) for section, _, item in items])
+    with _index_lock:
+        _index_cache[key] = (items, index)
+        while len(_index_cache) > INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return items, index
+
+
+def select_items(profile: dict, job_description: str, keywords: list[str],
+                 resume_length: str) -> tuple[dict, Optional[dict]]:
+    """
+    Returns the profile with each ranked section cut to its top-K items, and the
+    omitted items' labels per section (None when nothing was left out).
+    """
+    pages = target_pages(resume_length)
+    if pages is None:
+        return profile, None
+
+    limits = {section: per_page * pages for section, per_page in ITEMS_PER_PAGE.items()}
+    sections = [s for s, limit in limits.items() if len(profile.get(s) or []) > limit]
+    if not sections:
+        return profile, None
+
+    items, index = _index(profile, sections)
+    query = Counter(keyword_extractor.analyze(job_description))
+    for keyword in keywords:
+        for term in keyword_extractor.analyze(keyword):
+            query[term] += KEYWORD_WEIGHT
+    scores = index.scores(query)
+
+    selected, omitted = dict(profile), {}
+    for section in sections:
+        ranked = sorted(
+            ((score, i) for (s, i, _), score in zip(items, scores) if s == section),
+            key=lambda pair: (-pair[0], pair[1]),  # ties keep profile order
+        )
+        keep = sorted(i for _, i in ranked[:limits[section]])
+        drop = sorted(i for _, i in ranked[limits[section]:])
+        selected[section] = [profile[section][i] for i in keep]
+        labels = [_label(section, profile[section][i]) for i in drop[:MAX_OMITTED_LABELS]]
+        if len(drop) > MAX_OMITTED_LABELS:
+            labels.append(f"and {len(drop) - MAX_OMITTED_LABELS} more")
+        omitted[section] = labels
+    return selected, omitted
@@ -0,0 +1,54 @@
+"""
+Compact serialization of agent inputs.
+
+Model input is billed and processed per token, so agent messages leave out
+what the model doesn't need:
+- fields that are stitched back onto the output afterwards (basic_info),
+- nulls, empty strings and empty lists and objects,
+- the whitespace of the default JSON separators, and \\u escapes for non-ASCII text.
+
+Field names are kept: the output schemas use the same names, and the model
+maps input to output by them. Key order follows the pydantic models, so
+equal inputs always serialize to the same text.
+"""
+import json
+import math
+
+from app.agents.resume_tailor_agent.schema import ResumeInput
+
+# Profile fields the generation pipeline copies from the source profile instead of asking the model for them
+STITCHED_FIELDS = ("basic_info",)
+
+# Rough average for English text and JSON with Gemini's tokenizer
+CHARS_PER_TOKEN = 4
+
+
+def _empty(value) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def _prune(value):
+    if isinstance(value, dict):
+        pruned = {key: _prune(item) for key, item in value.items()}
+        return {key: item for key, item in pruned.items() if not _empty(item)}
+    if isinstance(value, list):
+        return [item for item in (_prune(item) for item in value) if not _empty(item)]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def compact_json(value) -> str:
+    return json.dumps(_prune(value), separators=(",", ":"), ensure_ascii=False)
+
+
+def serialize_resume_input(resume_input: ResumeInput) -> str:
+    """The resume agents' user message: ResumeInput without stitched-back fields, nulls or empties."""
+    data = resume_input.model_dump()
+    for field in STITCHED_FIELDS:
+        data["existing_resume"].pop(field, None)
+    return compact_json(data)
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
@@ -0,0 +1,164 @@
+"""
+Content-addressed on-disk cache for rendered resume documents.
+
+Entries are keyed by a hash of the resume content, template id, template code
+version, output format and PDF renderer (the native one by its source hash),
+and are evicted least-recently-used once the cache
+grows past its size budget.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.core.config import settings
+from app.services import pdf_renderer
+
+# Temp files older than this are left over from a crashed process; younger ones may be another process's put()
+STALE_TMP_SECONDS = 3600
+
+
+class RenderCache:
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # filename -> size, oldest first
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        """Rebuilds the LRU index from files left by a previous process, oldest access first."""
+        files = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+                if name.startswith(".tmp-"):
+                    if stat.st_mtime < time.time() - STALE_TMP_SECONDS:
+                        os.remove(path)  # half-written entry from a crashed process
+                    continue
+            except FileNotFoundError:
+                continue  # removed by another process meanwhile
+            if not os.path.isfile(path):
+                continue
+            files.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._total_bytes += size
+        self._evict()
+
+    @staticmethod
+    def make_key(resume_data: dict, template_id: int, template_version: str, fmt: str, renderer: str = "") -> str:
+        if renderer == "native":
+            # Template code doesn't cover native output: pdf_renderer.py lays out and styles it
+            renderer = f"native-{pdf_renderer.VERSION[:12]}"
+        payload = json.dumps(
+            {
+                "content": resume_data,
+                "template_id": template_id,
+                "template_version": template_version,
+                "format": fmt,
+                "renderer": renderer,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        # The template prefix lets stale entries be purged when a template's code changes.
+        return f"t{template_id}-{template_version[:12]}-{digest}.{fmt}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Returns the content of a cached render, or None on a miss.
+        Read under the lock, so a concurrent put() or eviction can't delete the file mid-read.
+        """
+        path = os.path.join(self.cache_dir, key)
+        with self._lock:
+            try:
+                if key not in self._entries:
+                    raise FileNotFoundError(path)
+                with open(path, "rb") as f:
+                    content = f.read()
+                # Touch the file so the LRU order survives a restart.
+                os.utime(path)
+            except FileNotFoundError:
+                self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return content
+
+    def put(self, key: str, data: bytes) -> Optional[str]:
+        """
+        Writes a rendered document into the cache atomically and returns its cached path,
+        or None if the write was lost (the render just isn't cached).
+        """
+        path = os.path.join(self.cache_dir, key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        try:
+            os.replace(tmp_path, path)
+        except FileNotFoundError:
+            print(f"Render cache: temp file for {key} was removed before it was stored")
+            return None
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            self._evict()
+        return path
+
+    def purge_template(self, template_id: int, current_version: str):
+        """Removes entries rendered by any other code version of the given template."""
+        prefix = f"t{template_id}-"
+        current = f"t{template_id}-{current_version[:12]}-"
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix) and not k.startswith(current)]:
+                self._drop(key)
+                self._remove_file(key)
+
+    def _drop(self, key: str):
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def _remove_file(self, key: str):
+        try:
+            os.remove(os.path.join(self.cache_dir, key))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self._remove_file(key)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+render_cache = RenderCache(
+    cache_dir=settings.RENDER_CACHE_DIR,
+    max_bytes=settings.RENDER_CACHE_MAX_BYTES,
+)
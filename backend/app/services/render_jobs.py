@@ -0,0 +1,129 @@
+"""
+Background render jobs for DOCX/PDF downloads.
+
+A job is submitted and rendered on this module's own bounded thread pool. Its
+artifact is stored in the render cache and served from there, so finished jobs
+only hold their metadata until they expire. Long renders
+(LibreOffice conversion in particular) therefore never hold one of the
+request threads that every sync endpoint shares.
+"""
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+from app.core.config import settings
+from app.services.render_cache import render_cache
+from app.services.template_service import template_service
+
+
+class RenderQueueFull(Exception):
+    pass
+
+
+class RenderJob:
+    def __init__(self, owner: str, resume_data: dict, fmt: str, pdf_renderer: str, filename: str, cache_key: str):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.resume_data = resume_data
+        self.fmt = fmt
+        self.pdf_renderer = pdf_renderer
+        self.filename = filename
+        self.cache_key = cache_key
+        self.status = "queued"
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.future: Optional[Future] = None
+
+    def artifact(self) -> Optional[bytes]:
+        """The rendered document, or None once the render cache has evicted it."""
+        return render_cache.get(self.cache_key)
+
+    def info(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "format": self.fmt,
+            "filename": self.filename,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class RenderJobQueue:
+    def __init__(self, max_workers: int, max_pending: int, ttl_seconds: float):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+        self._jobs: dict[str, RenderJob] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _run(self, job: RenderJob):
+        job.status = "running"
+        try:
+            if render_cache.get(job.cache_key) is None:
+                content = template_service.render(job.resume_data, job.fmt, job.pdf_renderer)
+                if render_cache.put(job.cache_key, content) is None:
+                    raise Exception("The rendered document could not be stored; submit the job again")
+            job.status = "done"
+        except Exception as e:
+            print(f"Render job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.resume_data = None
+            job.finished_at = time.time()
+
+    def _expire(self):
+        """Drops finished jobs older than the TTL. Caller holds the lock."""
+        cutoff = time.time() - self.ttl_seconds
+        for job_id in [j.id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def submit(self, owner: str, resume_data: dict, fmt: str, pdf_renderer: str, filename: str, cache_key: str) -> RenderJob:
+        job = RenderJob(owner, resume_data, fmt, pdf_renderer, filename, cache_key)
+        with self._lock:
+            self._expire()
+            pending = sum(1 for j in self._jobs.values() if j.status in ("queued", "running"))
+            if pending >= self.max_pending:
+                raise RenderQueueFull(f"{pending} render jobs are already pending; try again shortly")
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="render-job")
+            self._jobs[job.id] = job
+            job.future = self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str, owner: str) -> Optional[RenderJob]:
+        with self._lock:
+            self._expire()
+            job = self._jobs.get(job_id)
+        return job if job and job.owner == owner else None
+
+    async def wait(self, job: RenderJob, timeout: float):
+        """Waits up to `timeout` seconds for the job to finish, without tying up a thread."""
+        if job.future is None or job.future.done():
+            return
+        await asyncio.wait({asyncio.wrap_future(job.future)}, timeout=timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            statuses = [j.status for j in self._jobs.values()]
+        return {status: statuses.count(status) for status in ("queued", "running", "done", "failed")}
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+render_jobs = RenderJobQueue(
+    max_workers=settings.RENDER_JOB_WORKERS,
+    max_pending=settings.RENDER_JOB_MAX_PENDING,
+    ttl_seconds=settings.RENDER_JOB_TTL_SECONDS,
+)
@@ -0,0 +1,763 @@
+"""
+Resume generation pipeline (ATS keywords -> tailored resume -> save), and a
+background job queue that runs it with bounded concurrency and publishes
+per-stage progress events for Server-Sent Events subscribers.
+
+refine() makes a new version of a generated resume that rewrites only the
+sections a change affects, with the section writers, and reuses the rest.
+generate_batch() tailors one profile to many job descriptions.
+"""
+import asyncio
+import contextvars
+import json
+import re
+import time
+import uuid
+from typing import Optional
+
+from google.adk.apps import App
+from google.adk.events import Event, EventActions
+from google.adk.runners import Runner
+from google.genai.types import Content, Part
+
+from app.agents.resume_tailor_agent.agent import root_agent
+from app.agents.resume_tailor_agent.schema import ResumeInput
+from app.agents.resume_tailor_agent.sub_agents.ats_agent.agent import ats_agent
+from app.agents.resume_tailor_agent.sub_agents.resume_agent.agent import resume_agent
+from app.agents.resume_tailor_agent.sub_agents.resume_agent.schema import ResumeOutput
+from app.agents.resume_tailor_agent.sub_agents.review_agent.agent import review_agent
+from app.agents.resume_tailor_agent.sub_agents.section_agents.agent import section_tailor_agent
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.generated_resume import GeneratedResume
+from app.services import (
+    keyword_extractor, layout_estimator, llm_admission, llm_backend, llm_metrics, model_routing, profile_ranker,
+)
+from app.services.agent_events import EventCallback, run_agent_events
+from app.services.ats_cache import agent_version, ats_cache, normalize_job_description
+from app.services.generation_cache import ResultCache, SingleFlight
+from app.services.prompt_serializer import compact_json, estimate_tokens, serialize_resume_input
+from app.services.session_store import session_store
+from app.services.template_registry import template_registry
+
+app_name = root_agent.name
+
+
+class StageRunner(Runner):
+    """
+    Runs a single pipeline stage in a shared session. The session also holds other
+    stages' events, so always start this runner's agent instead of resolving one from them.
+    """
+
+    def _find_agent_to_run(self, session, root_agent):
+        return root_agent
+
+
+def _stage_runner(agent, latency_budget: Optional[float] = None) -> StageRunner:
+    root = model_routing.install(llm_backend.install(agent), latency_budget)
+    app = App(name=app_name, root_agent=root, plugins=[llm_metrics.metrics_plugin])
+    return StageRunner(app=app, session_service=session_store)
+
+
+# root_agent's two stages run separately, so a cached ATS result can skip the first.
+# Each runner gets a clone because the originals already belong to the SequentialAgent.
+ats_runner = _stage_runner(ats_agent.clone(), settings.ATS_LATENCY_BUDGET_SECONDS)
+resume_runner = _stage_runner(resume_agent.clone(), settings.RESUME_LATENCY_BUDGET_SECONDS)
+# refine(): each section writer on its own, by section name ("summary_skills", "experience", ...).
+# Cloned before section_runner installs the model backend on the originals.
+refine_runners = {
+    agent.output_key.removeprefix("section_"): _stage_runner(agent.clone(), settings.RESUME_LATENCY_BUDGET_SECONDS)
+    for agent in section_tailor_agent.sub_agents
+}
+# RESUME_PIPELINE="sections": the resume agent's work split into concurrent section writers plus a review
+section_runner = _stage_runner(section_tailor_agent, settings.RESUME_LATENCY_BUDGET_SECONDS)
+review_runner = _stage_runner(review_agent)
+
+
+def _resume_agents() -> list:
+    if settings.RESUME_PIPELINE == "sections":
+        return [*section_runner.agent.sub_agents, review_runner.agent]
+    return [resume_runner.agent]
+
+
+# Changes whenever any agent's model, prompt or output schema does, so cached results go stale
+PIPELINE_VERSION = [agent_version(agent) for agent in [ats_runner.agent, *_resume_agents()]]
+if settings.ATS_EXTRACTOR != "llm":
+    PIPELINE_VERSION.append(f"keywords:{settings.ATS_EXTRACTOR}:{keyword_extractor.VERSION}")
+if settings.PROFILE_PRERANK_ENABLED:
+    PIPELINE_VERSION.append("prerank:" + ",".join(f"{s}={k}" for s, k in profile_ranker.ITEMS_PER_PAGE.items()))
+if settings.FAST_ROUTE_MAX_TOKENS:
+    PIPELINE_VERSION.append(f"fast-route:{settings.FAST_MODEL}:{settings.FAST_ROUTE_MAX_TOKENS}")
+if settings.LLM_BACKEND != "gemini":
+    PIPELINE_VERSION.append(f"backend:{settings.LLM_BACKEND}")
+
+result_cache = ResultCache(
+    max_entries=settings.GENERATION_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.GENERATION_CACHE_TTL_SECONDS,
+)
+single_flight = SingleFlight()
+
+# Pipeline output entry naming the model that answered each agent (see _served_models)
+SERVED_MODELS_KEY = "served_models"
+
+# Job progress event published when a pipeline agent writes its output_key to session state
+STAGE_EVENTS = {"ats_feedback": "ats_done", "tailored_resume": "resume_drafted"}
+
+
+class GenerationError(Exception):
+    pass
+
+
+class GenerationQueueFull(Exception):
+    pass
+
+
+class GenerationRequest:
+    """Everything one generation needs, resolved up front so it can outlive the HTTP request."""
+
+    def __init__(self, user_id: int, source_profile_id: int, source_profile_data: dict, job_description: str,
+                 generation_name: str, ats_feedback: Optional[str] = None, template_id: Optional[int] = None,
+                 resume_length: str = "1 page", trim_to_length: bool = False, ats_output: Optional[dict] = None):
+        self.user_id = user_id
+        self.source_profile_id = source_profile_id
+        self.source_profile_data = source_profile_data
+        self.job_description = job_description
+        self.generation_name = generation_name
+        self.ats_feedback = ats_feedback
+        self.template_id = template_id
+        self.resume_length = resume_length
+        self.trim_to_length = trim_to_length
+        # Set when the ATS stage already ran for this job description (generate_batch)
+        self.ats_output = ats_output
+
+
+async def _noop(event: str, data: dict):
+    pass
+
+
+async def _append_ats_turn(user_id: str, session_id: str, ats_output: dict):
+    await session_store.ensure_session(app_name, user_id, session_id)
+    session = await session_store.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+    await session_store.append_event(session, Event(
+        invocation_id=Event.new_id(),
+        author=ats_runner.agent.name,
+        content=Content(role="model", parts=[Part(text=json.dumps(ats_output))]),
+        actions=EventActions(state_delta={ats_runner.agent.output_key: ats_output}),
+    ))
+
+
+async def _record_ats_output(user_id: str, session_id: str, ats_output: dict, on_event: EventCallback,
+                             elapsed_ms: int, source: str):
+    """Records an ATS output that didn't come from the agent as the ATS agent's turn,
+    exactly what the resume agent would see after a live run."""
+    stage = ats_runner.agent.name
+    await _append_ats_turn(user_id, session_id, ats_output)
+    await on_event("stage_started", {"stage": stage})
+    await on_event("stage_finished", {
+        "stage": stage, "output_key": ats_runner.agent.output_key, "output": ats_output,
+        "elapsed_ms": elapsed_ms, source: True,
+    })
+
+
+async def _run_ats_stage(request: GenerationRequest, user_id: str, session_id: str, db,
+                         on_event: EventCallback, partial: bool) -> dict:
+    """
+    Puts the ATS output in the session: the request's own when it has one, else from the local
+    keyword extractor when ATS_EXTRACTOR allows it, else from the cache when this job description
+    was seen before, else from the ATS agent.
+    """
+    if request.ats_output is not None:
+        await _record_ats_output(user_id, session_id, request.ats_output, on_event, 0, "shared")
+        return request.ats_output
+
+    if settings.ATS_EXTRACTOR in ("local", "auto"):
+        started = time.perf_counter()
+        ats_output = keyword_extractor.extract_ats_output(request.job_description, request.source_profile_data)
+        # "auto" only trusts it for postings in the lexicon's domain; the agent handles the rest
+        recognized = len(keyword_extractor.known_skills(ats_output["keywords"]))
+        if settings.ATS_EXTRACTOR == "local" or recognized >= settings.ATS_LOCAL_MIN_SKILLS:
+            elapsed_ms = round((time.perf_counter() - started) * 1000)
+            await _record_ats_output(user_id, session_id, ats_output, on_event, elapsed_ms, "local")
+            return ats_output
+
+    ats_output = ats_cache.get(db, request.job_description) if settings.ATS_CACHE_ENABLED else None
+    if ats_output is not None:
+        await _record_ats_output(user_id, session_id, ats_output, on_event, 0, "cached")
+        return ats_output
+
+    # The ATS prompt only covers the job description, so that is all it is given
+    ats_message = Content(role="user", parts=[Part(text=request.job_description)])
+    async for event, data in run_agent_events(ats_runner, user_id, session_id, ats_message, partial):
+        await on_event(event, data)
+    session = await session_store.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+    ats_output = session.state.get(ats_runner.agent.output_key)
+    if not ats_output:
+        raise GenerationError("Failed to extract ATS keywords")
+    # Entries are keyed by the ATS agent's own model; an answer from FAST_MODEL (model_routing) isn't one
+    route = _served_models(session).get(ats_runner.agent.name, {}).get("route", "primary")
+    if settings.ATS_CACHE_ENABLED and route == "primary":
+        ats_cache.put(db, request.job_description, ats_output)
+    return ats_output
+
+
+async def _run_resume_stage(resume_input: ResumeInput, resume_message: Content, user_id: str, session_id: str,
+                            on_event: EventCallback, partial: bool) -> dict:
+    """Writes the whole ResumeOutput in one resume agent call."""
+    async for event, data in run_agent_events(resume_runner, user_id, session_id, resume_message, partial):
+        await on_event(event, data)
+
+    final_session = await session_store.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+    # Expected to be ResumeOutput (tailored_resume, verdict, strength, weakness)
+    agent_output = final_session.state.get(resume_runner.agent.output_key) if final_session else None
+    if not agent_output:
+        raise GenerationError("Failed to generate resume")
+    return agent_output
+
+
+async def _run_review_stage(resume_input: ResumeInput, tailored_resume: dict, user_id: str, session_id: str,
+                            on_event: EventCallback, partial: bool) -> dict:
+    """Asks the review agent for the verdict, strength and weakness of an assembled resume."""
+    review_message = Content(role="user", parts=[Part(text=compact_json({
+        "job_description": resume_input.job_description,
+        "tailored_resume": tailored_resume,
+    }))])
+    async for event, data in run_agent_events(review_runner, user_id, session_id, review_message, partial):
+        await on_event(event, data)
+
+    session = await session_store.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+    review = session.state.get(review_runner.agent.output_key) if session else None
+    if not review:
+        raise GenerationError("Failed to generate resume: no review")
+    return review
+
+
+async def _run_section_stages(resume_input: ResumeInput, resume_message: Content, user_id: str, session_id: str,
+                              on_event: EventCallback, partial: bool) -> dict:
+    """
+    Writes the sections concurrently, merges them and asks the review agent for the verdict.
+    Returns the same ResumeOutput as the single resume agent call.
+    """
+    started = time.perf_counter()
+    async for event, data in run_agent_events(section_runner, user_id, session_id, resume_message, partial):
+        await on_event(event, data)
+
+    session = await session_store.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+    tailored_resume = {}
+    for agent in section_runner.agent.sub_agents:
+        section = session.state.get(agent.output_key) if session else None
+        if not section:
+            raise GenerationError(f"Failed to generate resume: {agent.name} returned nothing")
+        tailored_resume.update(section)
+
+    review = await _run_review_stage(resume_input, tailored_resume, user_id, session_id, on_event, partial)
+    agent_output = ResumeOutput(tailored_resume=tailored_resume, **review).model_dump()
+    # Reported under the resume agent's output_key, so clients see the same stages either way
+    await on_event("stage_finished", {
+        "stage": section_runner.agent.name, "output_key": resume_runner.agent.output_key, "output": agent_output,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000),
+    })
+    return agent_output
+
+
+def _served_models(session) -> dict:
+    """The model that gave each agent's final response in the session, and its model_routing route if any."""
+    served = {}
+    for event in session.events if session else []:
+        metadata = event.custom_metadata or {}
+        model = metadata.get("served_model") or event.model_version
+        if model and not event.partial:
+            served[event.author] = {"model": model, **({"route": metadata["route"]} if "route" in metadata else {})}
+    return served
+
+
+def _resume_input(request: GenerationRequest, ats_output: dict) -> ResumeInput:
+    profile, omitted = request.source_profile_data, None
+    if settings.PROFILE_PRERANK_ENABLED:
+        profile, omitted = profile_ranker.select_items(
+            profile, request.job_description, ats_output.get("keywords") or [], request.resume_length
+        )
+    return ResumeInput(
+        existing_resume=profile,
+        job_description=request.job_description,
+        ats_feedback=request.ats_feedback,
+        resume_length=request.resume_length,
+        omitted_items=omitted,
+    )
+
+
+async def _run_stages(request: GenerationRequest, on_event: EventCallback, partial: bool) -> dict:
+    """Runs the ATS and resume stages in a fresh session; returns both stages' outputs and the models that served them."""
+    session_id = f"resume-session-{uuid.uuid4()}"
+    user_id = str(request.user_id)
+    # The outputs are all that is kept; the event history would otherwise stay in memory
+    async with session_store.reserve(app_name, user_id, session_id):
+        # Own DB session: a coalesced run can outlive the request that started it
+        db = SessionLocal()
+        try:
+            ats_output = await _run_ats_stage(request, user_id, session_id, db, on_event, partial)
+        finally:
+            db.close()
+
+        resume_input = _resume_input(request, ats_output)
+        resume_text = serialize_resume_input(resume_input)
+        omitted = resume_input.omitted_items
+        omitted_counts = ", ".join(f"{section} {len(labels)}" for section, labels in (omitted or {}).items())
+        print(f"Resume agent input: ~{estimate_tokens(resume_text)} tokens "
+              f"(~{estimate_tokens(json.dumps(request.source_profile_data))} for the full profile as plain JSON)"
+              + (f", omitted {omitted_counts}" if omitted_counts else ""))
+        resume_message = Content(role="user", parts=[Part(text=resume_text)])
+
+        run_resume = _run_section_stages if settings.RESUME_PIPELINE == "sections" else _run_resume_stage
+        # Small inputs don't need the primary model (1-page resumes only; longer ones are worth it)
+        small = (settings.FAST_ROUTE_MAX_TOKENS and layout_estimator.target_pages(request.resume_length) == 1
+                 and estimate_tokens(resume_text) <= settings.FAST_ROUTE_MAX_TOKENS)
+        with model_routing.fast_route(bool(small)):
+            agent_output = await run_resume(resume_input, resume_message, user_id, session_id, on_event, partial)
+
+        session = await session_store.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        return {
+            ats_runner.agent.output_key: ats_output,
+            resume_runner.agent.output_key: agent_output,
+            SERVED_MODELS_KEY: _served_models(session),
+        }
+
+
+def _result_key(request: GenerationRequest) -> str:
+    # The template only affects stitching and the length check, which run per request
+    return result_cache.make_key(
+        profile=request.source_profile_data,
+        job_description=request.job_description,
+        ats_feedback=request.ats_feedback,
+        resume_length=request.resume_length,
+        agents=PIPELINE_VERSION,
+    )
+
+
+async def _replay(outputs: dict, on_event: EventCallback, source: str):
+    """Reports stages this request didn't run itself, so every caller sees the same stage events."""
+    for runner in (ats_runner, resume_runner):
+        await on_event("stage_finished", {
+            "stage": runner.agent.name, "output_key": runner.agent.output_key,
+            "output": outputs[runner.agent.output_key], "elapsed_ms": 0, source: True,
+        })
+
+
+async def run_pipeline(request: GenerationRequest, on_event: EventCallback = _noop, partial: bool = False) -> dict:
+    """
+    Runs the ATS -> resume agent pipeline and returns its outputs: the ATS and resume
+    agents' outputs under their output_keys, and the models that served them.
+    Agent events are passed to on_event as they happen (see agent_events).
+
+    A recent identical request's output is reused, and identical requests arriving
+    while one is running wait for that run instead of starting their own; they get
+    its events too, stage_finished marked "coalesced".
+    """
+    key = _result_key(request)
+    outputs = result_cache.get(key)
+    if outputs is not None:
+        await _replay(outputs, on_event, "cached")
+        return outputs
+
+    leader = not single_flight.running(key)
+    if leader:
+        # Only the caller that starts a run can be refused; the run itself then waits for admission
+        llm_admission.admission.check(str(request.user_id))
+
+    async def forward(event: str, data: dict):
+        if event == "partial" and not partial:
+            return
+        if event == "stage_finished" and not leader:
+            data = {**data, "coalesced": True}
+        await on_event(event, data)
+
+    # The shared run must not depend on whichever caller started it: it is never refused
+    # mid-run, and its model calls are tracked on their own and charged to that caller below
+    context = contextvars.copy_context()
+    context.run(llm_admission.set_rejectable, False)
+    run_usage = context.run(llm_metrics.track)
+
+    async def run_and_cache(publish: EventCallback):
+        outputs = await _run_stages(request, publish, partial)
+        result_cache.put(key, outputs)
+        return outputs
+
+    outputs, leader = await single_flight.do(key, run_and_cache, forward, context)
+    if leader:
+        llm_metrics.charge(run_usage)
+    return outputs
+
+
+def build_content(request: GenerationRequest, agent_output: dict) -> dict:
+    """Stitches the static profile info onto the agent output and checks it against resume_length."""
+    # STITCHING LOGIC: Combine static info from source with dynamic info from agent
+    tailored_data = agent_output.get("tailored_resume", {})
+    basic_info = request.source_profile_data.get("basic_info", {})
+    full_resume_data = {
+        "basic_info": basic_info,
+        **tailored_data # about, skills, education, experience, etc.
+    }
+
+    # Check the result against resume_length without rendering it
+    meta = {}
+    layout = getattr(template_registry.get(request.template_id).generator, "LAYOUT", None)
+    if layout:
+        full_resume_data, meta["layout"] = layout_estimator.fit_to_length(
+            full_resume_data, layout, request.resume_length, trim=request.trim_to_length
+        )
+
+    # Kept so a refinement can default to the same length
+    meta["resume_length"] = request.resume_length
+
+    # The final result to save includes the full resume + analysis
+    return {
+        "resume": full_resume_data,
+        "analysis": {
+            "verdict": agent_output.get("verdict"),
+            "strength": agent_output.get("strength"),
+            "weakness": agent_output.get("weakness")
+        },
+        "meta": meta
+    }
+
+
+def save(request: GenerationRequest, content: dict, db) -> GeneratedResume:
+    generated_resume = GeneratedResume(
+        user_id=request.user_id,
+        source_profile_id=request.source_profile_id,
+        name=request.generation_name,
+        job_description=request.job_description,
+        template_id=request.template_id,
+        tailored_resume_content=content
+    )
+    db.add(generated_resume)
+    db.commit()
+    db.refresh(generated_resume)
+    return generated_resume
+
+
+async def generate(request: GenerationRequest, db, on_event: EventCallback = _noop, partial: bool = False) -> GeneratedResume:
+    usage = llm_metrics.track()
+    outputs = await run_pipeline(request, on_event, partial)
+    content = build_content(request, outputs[resume_runner.agent.output_key])
+    # Models that wrote this resume, also when the output was reused from an identical request
+    content["meta"]["models"] = outputs[SERVED_MODELS_KEY]
+    # Model calls this generation made; empty when its output came from the cache or a coalesced run
+    content["meta"]["llm_usage"] = usage.to_dict()
+    generated_resume = save(request, content, db)
+    await on_event("persisted", {"resume_id": generated_resume.id})
+    return generated_resume
+
+
+async def extract_ats(request: GenerationRequest) -> dict:
+    """Runs only the ATS stage for the request's job description, in a session of its own."""
+    session_id = f"resume-ats-session-{uuid.uuid4()}"
+    user_id = str(request.user_id)
+    async with session_store.reserve(app_name, user_id, session_id):
+        db = SessionLocal()
+        try:
+            return await _run_ats_stage(request, user_id, session_id, db, _noop, False)
+        finally:
+            db.close()
+
+
+async def generate_batch(requests: list[GenerationRequest], on_event: EventCallback, max_concurrency: int) -> dict:
+    """
+    Generates and saves a resume for each request (one profile, many job descriptions), reporting each
+    as it is saved: item_done {"index", "id", "name", "template_id", "tailored_resume_content"},
+    or item_failed {"index", "error"}. Returns the resume ids in request order (None where it failed).
+
+    The ATS stage runs once per distinct job description, as soon as the batch starts; at most
+    max_concurrency ATS stages and tailoring runs go at a time.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    ats_tasks: dict[str, asyncio.Task] = {}
+    resume_ids: list[Optional[int]] = [None] * len(requests)
+
+    async def ats(request: GenerationRequest) -> dict:
+        async with semaphore:
+            return await extract_ats(request)
+
+    for request in requests:
+        key = normalize_job_description(request.job_description)
+        if key not in ats_tasks:
+            ats_tasks[key] = asyncio.create_task(ats(request))
+
+    async def run_item(index: int, request: GenerationRequest):
+        try:
+            request.ats_output = await ats_tasks[normalize_job_description(request.job_description)]
+            async with semaphore:
+                db = SessionLocal()
+                try:
+                    generated_resume = await generate(request, db)
+                finally:
+                    db.close()
+            resume_ids[index] = generated_resume.id
+            await on_event("item_done", {
+                "index": index,
+                "id": generated_resume.id,
+                "name": generated_resume.name,
+                "template_id": generated_resume.template_id,
+                "tailored_resume_content": generated_resume.tailored_resume_content,
+            })
+        except Exception as e:
+            print(f"Batch item {index} failed: {e}")
+            await on_event("item_failed", {"index": index, "error": str(e)})
+
+    try:
+        await asyncio.gather(*(run_item(i, request) for i, request in enumerate(requests)))
+    finally:
+        # Only left running if the batch was cancelled
+        for task in ats_tasks.values():
+            task.cancel()
+        await asyncio.gather(*ats_tasks.values(), return_exceptions=True)
+    return {
+        "resume_ids": resume_ids,
+        "completed": sum(1 for resume_id in resume_ids if resume_id is not None),
+        "failed": sum(1 for resume_id in resume_ids if resume_id is None),
+        "distinct_job_descriptions": len(ats_tasks),
+    }
+
+
+# Resume fields each section writer owns, by section name
+REFINE_SECTIONS = {name: tuple(runner.agent.output_schema.model_fields) for name, runner in refine_runners.items()}
+
+# Words in feedback that point at a section
+SECTION_MENTIONS = {
+    "summary_skills": re.compile(r"\b(summary|about|skill)", re.IGNORECASE),
+    "experience": re.compile(r"\b(experience|role|bullet|employ|work history)", re.IGNORECASE),
+    "projects": re.compile(r"\bproject", re.IGNORECASE),
+    "credentials": re.compile(r"\b(education|degree|certific|award|publication)", re.IGNORECASE),
+}
+
+
+def _mentions(terms: set[str], keywords) -> bool:
+    """Whether any keyword occurs among the terms (all of a phrase's words)."""
+    for keyword in keywords:
+        keyword_terms = keyword_extractor.analyze(keyword)
+        if keyword_terms and all(term in terms for term in keyword_terms):
+            return True
+    return False
+
+
+def affected_sections(resume: dict, profile: dict, old_job_description: str, job_description: str,
+                      feedback: Optional[str], requested: Optional[list[str]] = None) -> dict[str, str]:
+    """
+    The sections a refinement rewrites, each with its reason. Requested sections, if any,
+    are the only ones. Otherwise:
+    - feedback: the sections it names, else those sharing its keywords, else all of them;
+    - a changed job description: about and skills, plus every section whose resume or
+      profile content has a keyword the old or the new description alone asks for.
+    """
+    if requested:
+        return {name: "requested" for name in REFINE_SECTIONS if name in requested}
+
+    # Everything a section could be rewritten from: what the resume says now, and the profile behind it
+    terms = {
+        name: set(keyword_extractor.analyze(compact_json({
+            field: [resume.get(field), profile.get(field)] for field in fields
+        })))
+        for name, fields in REFINE_SECTIONS.items()
+    }
+    affected = {}
+    if feedback:
+        named = [name for name, pattern in SECTION_MENTIONS.items() if pattern.search(feedback)]
+        if not named:
+            feedback_keywords = keyword_extractor.extract_keywords(feedback)
+            named = [name for name in REFINE_SECTIONS if _mentions(terms[name], feedback_keywords)]
+        for name in named or REFINE_SECTIONS:
+            affected[name] = "feedback"
+
+    if " ".join(job_description.split()) != " ".join(old_job_description.split()):
+        changed = (set(keyword_extractor.extract_keywords(job_description))
+                   ^ set(keyword_extractor.extract_keywords(old_job_description)))
+        for name in REFINE_SECTIONS:
+            if name not in affected and (name == "summary_skills" or _mentions(terms[name], changed)):
+                affected[name] = "job description changed"
+    return {name: affected[name] for name in REFINE_SECTIONS if name in affected}
+
+
+async def refine(source: GeneratedResume, request: GenerationRequest, sections: dict[str, str], db,
+                 on_event: EventCallback = _noop) -> GeneratedResume:
+    """
+    Saves a new version of `source` for `request` in which only `sections` (see affected_sections)
+    are rewritten, each writer revising its current version; the other sections are copied as they are.
+    The review agent then re-assesses the whole resume.
+    """
+    usage = llm_metrics.track()
+    old_content = source.tailored_resume_content or {}
+    old_resume = old_content.get("resume", {})
+    session_id = f"resume-refine-session-{uuid.uuid4()}"
+    user_id = str(request.user_id)
+    async with session_store.reserve(app_name, user_id, session_id):
+        # Cached or local for an unchanged job description, so it costs nothing then
+        ats_output = await _run_ats_stage(request, user_id, session_id, db, on_event, False)
+        resume_input = _resume_input(request, ats_output)
+
+        async def rewrite(name: str) -> tuple[dict, dict]:
+            """The rewritten section and the model that wrote it."""
+            runner = refine_runners[name]
+            current = {field: old_resume.get(field) for field in REFINE_SECTIONS[name]}
+            message = Content(role="user", parts=[Part(text=serialize_resume_input(
+                resume_input.model_copy(update={"current_sections": current})
+            ))])
+            # A session per writer, holding only the ATS turn, like a ParallelAgent branch:
+            # the writers run concurrently and must not see each other's output
+            section_session_id = f"{session_id}-{name}"
+            async with session_store.reserve(app_name, user_id, section_session_id):
+                await _append_ats_turn(user_id, section_session_id, ats_output)
+                async for event, data in run_agent_events(runner, user_id, section_session_id, message):
+                    await on_event(event, data)
+                session = await session_store.get_session(app_name=app_name, user_id=user_id, session_id=section_session_id)
+            section = session.state.get(runner.agent.output_key) if session else None
+            if not section:
+                raise GenerationError(f"Failed to refine resume: {runner.agent.name} returned nothing")
+            return section, _served_models(session)
+
+        tailored_resume = {key: value for key, value in old_resume.items() if key != "basic_info"}
+        served = {}
+        for section, section_served in await asyncio.gather(*(rewrite(name) for name in sections)):
+            tailored_resume.update(section)
+            served.update(section_served)
+        review = await _run_review_stage(resume_input, tailored_resume, user_id, session_id, on_event, False)
+        agent_output = ResumeOutput(tailored_resume=tailored_resume, **review).model_dump()
+        session = await session_store.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        served.update(_served_models(session))
+
+    content = build_content(request, agent_output)
+    content["meta"]["models"] = {**old_content.get("meta", {}).get("models", {}), **served}
+    content["meta"]["refined"] = {"from_resume_id": source.id, "sections": sections}
+    content["meta"]["llm_usage"] = usage.to_dict()
+    generated_resume = save(request, content, db)
+    await on_event("persisted", {"resume_id": generated_resume.id})
+    return generated_resume
+
+
+class GenerationJob:
+    def __init__(self, owner: str, request: GenerationRequest):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.request = request
+        self.status = "queued"
+        self.resume_id: Optional[int] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.events: list[dict] = []
+        self._changed = asyncio.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    async def publish(self, event: str, data: dict, status: Optional[str] = None):
+        """Appends an event; a status change is applied under the same lock, so subscribers see both together."""
+        async with self._changed:
+            if status:
+                self.status = status
+            self.events.append({"id": len(self.events), "event": event, "data": {"job_id": self.id, **data}})
+            self._changed.notify_all()
+
+    async def subscribe(self, after: int = -1):
+        """Yields the job's events with id > `after`, then new ones as they happen, until the job finishes."""
+        index = after + 1
+        while True:
+            async with self._changed:
+                while index >= len(self.events) and not self.finished:
+                    await self._changed.wait()
+                pending = self.events[index:]
+                finished = self.finished
+            for event in pending:
+                yield event
+            index += len(pending)
+            if finished and index >= len(self.events):
+                return
+
+    def info(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "resume_id": self.resume_id,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class GenerationJobQueue:
+    def __init__(self, max_concurrency: int, max_pending: int, ttl_seconds: float):
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+        self._jobs: dict[str, GenerationJob] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def _run(self, job: GenerationJob):
+        async def progress(event: str, data: dict):
+            # Jobs keep a compact log: one event per finished stage, without the stage output
+            if event == "stage_finished" and data["output_key"] in STAGE_EVENTS:
+                await job.publish(STAGE_EVENTS[data["output_key"]], {"agent": data["stage"]})
+            elif event == "persisted":
+                await job.publish(event, data)
+
+        # Jobs are bounded by this queue already, so their model runs wait for admission instead of failing
+        llm_admission.set_rejectable(False)
+        async with self._semaphore:
+            await job.publish("started", {}, status="running")
+            db = SessionLocal()
+            try:
+                generated_resume = await generate(job.request, db, progress)
+                job.resume_id = generated_resume.id
+                job.finished_at = time.time()
+                await job.publish("done", {"resume_id": job.resume_id}, status="done")
+            except Exception as e:
+                print(f"Generation job {job.id} failed: {e}")
+                job.error = str(e)
+                job.finished_at = time.time()
+                await job.publish("failed", {"error": job.error}, status="failed")
+            finally:
+                db.close()
+                job.request = None
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl_seconds
+        for job_id in [j.id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def submit(self, owner: str, request: GenerationRequest) -> GenerationJob:
+        """Must be called from the event loop; the pipeline runs as a task on it."""
+        self._expire()
+        pending = sum(1 for j in self._jobs.values() if not j.finished)
+        if pending >= self.max_pending:
+            raise GenerationQueueFull(f"{pending} generation jobs are already pending; try again shortly")
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        job = GenerationJob(owner, request)
+        job.events.append({"id": 0, "event": "queued", "data": {"job_id": job.id}})
+        self._jobs[job.id] = job
+        task = asyncio.create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: str, owner: str) -> Optional[GenerationJob]:
+        self._expire()
+        job = self._jobs.get(job_id)
+        return job if job and job.owner == owner else None
+
+    def stats(self) -> dict:
+        statuses = [j.status for j in self._jobs.values()]
+        return {status: statuses.count(status) for status in ("queued", "running", "done", "failed")}
+
+    async def shutdown(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+generation_jobs = GenerationJobQueue(
+    max_concurrency=settings.GENERATION_MAX_CONCURRENCY,
+    max_pending=settings.GENERATION_MAX_PENDING,
+    ttl_seconds=settings.GENERATION_JOB_TTL_SECONDS,
+)
@@ -0,0 +1,130 @@
+"""
+In-memory ADK session store with a size cap and TTL.
+
+Every generation and profile extraction uses a session holding the full
+event history, whole resumes included. Callers hold their sessions with
+reserve(), which deletes them at the end of the block; a reserved session is
+only created once its first run has been admitted (ensure_session), so runs
+waiting in the admission queue hold nothing.
+
+Eviction is the safety net for sessions that are never deleted: unreserved
+sessions unused for longer than the TTL go first, then the least recently used
+ones once the store is over its size cap. Reserved sessions are never evicted.
+
+The live count and approximate size (serialized events, plus the state a session
+was created with) are kept up to date as sessions change, for /health and /metrics.
+"""
+import time
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager
+
+from google.adk.sessions import InMemorySessionService
+
+from app.core.config import settings
+from app.services.metrics import registry
+
+live_sessions = registry.gauge("adk_live_sessions", "ADK sessions held in memory.")
+session_bytes = registry.gauge("adk_session_bytes", "Approximate size of the ADK sessions held in memory (serialized events and state).")
+
+
+class BoundedSessionService(InMemorySessionService):
+    def __init__(self, max_sessions: int, ttl_seconds: float):
+        super().__init__()
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._last_used: "OrderedDict[tuple[str, str, str], float]" = OrderedDict()  # least recently used first
+        self._reserved: Counter = Counter()
+        self._bytes: dict[tuple[str, str, str], int] = {}
+        self._total_bytes = 0
+        self.evicted = 0
+
+    def _touch(self, key: tuple[str, str, str]):
+        self._last_used[key] = time.time()
+        self._last_used.move_to_end(key)
+
+    def _add_bytes(self, key: tuple[str, str, str], size: int):
+        self._bytes[key] = self._bytes.get(key, 0) + size
+        self._total_bytes += size
+        self._publish()
+
+    def _publish(self):
+        live_sessions.set(len(self._last_used))
+        session_bytes.set(self._total_bytes)
+
+    def _create_session_impl(self, *, app_name, user_id, state=None, session_id=None):
+        session = super()._create_session_impl(app_name=app_name, user_id=user_id, state=state, session_id=session_id)
+        key = (app_name, user_id, session.id)
+        self._touch(key)
+        self._add_bytes(key, len(session.model_dump_json()))
+        self._evict()
+        return session
+
+    async def append_event(self, session, event):
+        event = await super().append_event(session, event)
+        key = (session.app_name, session.user_id, session.id)
+        if key in self._last_used and not event.partial:
+            self._touch(key)
+            self._add_bytes(key, len(event.model_dump_json()))
+        return event
+
+    def _delete_session_impl(self, *, app_name, user_id, session_id):
+        super()._delete_session_impl(app_name=app_name, user_id=user_id, session_id=session_id)
+        key = (app_name, user_id, session_id)
+        self._last_used.pop(key, None)
+        self._total_bytes -= self._bytes.pop(key, 0)
+        self._publish()
+        # Drop emptied per-user maps too, or one entry per user ever seen would stay behind
+        user_sessions = self.sessions.get(app_name, {})
+        if user_id in user_sessions and not user_sessions[user_id]:
+            del user_sessions[user_id]
+
+    def _evict(self):
+        cutoff = time.time() - self.ttl_seconds
+        over = len(self._last_used) - self.max_sessions
+        for key, last_used in list(self._last_used.items()):
+            if last_used >= cutoff and over <= 0:
+                break
+            if self._reserved[key]:
+                continue  # in use by a run; the cap gives way
+            app_name, user_id, session_id = key
+            print(f"Evicting ADK session {session_id} ({app_name})")
+            self._delete_session_impl(app_name=app_name, user_id=user_id, session_id=session_id)
+            self.evicted += 1
+            over -= 1
+
+    @asynccontextmanager
+    async def reserve(self, app_name: str, user_id: str, session_id: str):
+        """
+        Holds the session for the block, protected from eviction, and deletes it afterwards.
+        The session itself is created by the first ensure_session() call.
+        """
+        key = (app_name, user_id, session_id)
+        self._reserved[key] += 1
+        try:
+            yield session_id
+        finally:
+            self._reserved[key] -= 1
+            if not self._reserved[key]:
+                del self._reserved[key]
+            await self.delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+
+    async def ensure_session(self, app_name: str, user_id: str, session_id: str):
+        """Creates the session unless it already exists."""
+        if (app_name, user_id, session_id) not in self._last_used:
+            await self.create_session(app_name=app_name, user_id=user_id, session_id=session_id)
+
+    def stats(self) -> dict:
+        """Live session count and approximate size (serialized events and state)."""
+        return {
+            "live": len(self._last_used),
+            "bytes": self._total_bytes,
+            "max_sessions": self.max_sessions,
+            "reserved": len(self._reserved),
+            "evicted": self.evicted,
+        }
+
+
+session_store = BoundedSessionService(
+    max_sessions=settings.SESSION_STORE_MAX_SESSIONS,
+    ttl_seconds=settings.SESSION_STORE_TTL_SECONDS,
+)
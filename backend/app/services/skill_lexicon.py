@@ -0,0 +1,141 @@
+"""
+Curated skill lexicon for local keyword extraction: canonical skill name -> aliases.
+
+Aliases are matched case-insensitively as whole tokens or token sequences, so
+"k8s", "kubernetes" and "Kubernetes" all count as "Kubernetes". The canonical
+name is always an alias of itself and doesn't need listing.
+
+Names in CASE_SENSITIVE (canonical or alias) are also ordinary words ("go",
+"swift", "the rest of"), so they only match when written exactly as listed.
+"""
+
+SKILL_LEXICON: dict[str, list[str]] = {
+    # Languages
+    "Python": ["python3"],
+    "Java": [],
+    "JavaScript": ["js", "ecmascript", "es6"],
+    "TypeScript": [],
+    "Go": ["golang"],
+    "Rust": [],
+    "C": [],
+    "C++": ["cpp"],
+    "C#": ["csharp", "c sharp"],
+    "Ruby": [],
+    "PHP": [],
+    "Kotlin": [],
+    "Swift": [],
+    "Scala": [],
+    "R": [],
+    "MATLAB": [],
+    "SQL": [],
+    "Bash": ["shell scripting", "shell script", "shell scripts"],
+    "HTML": ["html5"],
+    "CSS": ["css3"],
+
+    # Frontend
+    "React": ["react.js", "reactjs"],
+    "Angular": ["angular.js", "angularjs"],
+    "Vue.js": ["vue", "vuejs"],
+    "Next.js": ["nextjs"],
+    "Redux": [],
+    "Tailwind CSS": ["tailwind", "tailwindcss"],
+    "Frontend Development": ["frontend", "front-end", "front end"],
+
+    # Backend and APIs
+    "Node.js": ["Node", "nodejs"],
+    "Express": ["express.js", "expressjs"],
+    "Django": [],
+    "Flask": [],
+    "FastAPI": [],
+    "Spring Boot": ["Spring", "springboot"],
+    ".NET": ["dotnet", "asp.net", ".net core"],
+    "Ruby on Rails": ["rails", "ror"],
+    "REST APIs": ["REST", "restful", "rest api", "restful apis", "restful api"],
+    "GraphQL": [],
+    "gRPC": [],
+    "Microservices": ["microservice", "micro-services", "microservice architecture"],
+    "Backend Development": ["backend", "back-end", "back end"],
+
+    # Data stores and messaging
+    "PostgreSQL": ["postgres", "psql"],
+    "MySQL": [],
+    "SQLite": [],
+    "MongoDB": ["mongo"],
+    "Redis": [],
+    "Elasticsearch": ["elastic search", "opensearch"],
+    "Cassandra": [],
+    "DynamoDB": ["dynamo"],
+    "Snowflake": [],
+    "BigQuery": ["big query"],
+    "Kafka": ["apache kafka"],
+    "RabbitMQ": ["rabbit mq"],
+    "NoSQL": [],
+
+    # Cloud, infrastructure and operations
+    "AWS": ["amazon web services"],
+    "GCP": ["google cloud", "google cloud platform"],
+    "Azure": ["microsoft azure"],
+    "Docker": ["containerization"],
+    "Kubernetes": ["k8s", "kube", "eks", "gke", "aks"],
+    "Terraform": [],
+    "Ansible": [],
+    "Helm": [],
+    "Linux": ["unix"],
+    "CI/CD": ["CI", "continuous integration", "continuous delivery", "continuous deployment"],
+    "GitHub Actions": [],
+    "Jenkins": [],
+    "Git": ["github", "gitlab", "version control"],
+    "Prometheus": [],
+    "Grafana": [],
+    "Observability": ["monitoring", "logging", "tracing"],
+    "Serverless": ["lambda", "aws lambda", "cloud functions"],
+    "Infrastructure as Code": ["iac"],
+    "DevOps": [],
+    "SRE": ["site reliability", "site reliability engineering"],
+    "Networking": ["tcp/ip", "dns"],
+
+    # Data, ML and AI
+    "Machine Learning": ["ml"],
+    "Deep Learning": ["neural networks"],
+    "Artificial Intelligence": ["ai"],
+    "Generative AI": ["genai", "gen ai", "llm", "llms", "large language models"],
+    "NLP": ["natural language processing"],
+    "Computer Vision": [],
+    "TensorFlow": [],
+    "PyTorch": ["torch"],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "Pandas": [],
+    "NumPy": [],
+    "Spark": ["pyspark", "apache spark"],
+    "Airflow": ["apache airflow"],
+    "dbt": [],
+    "ETL": ["elt", "data pipelines", "data pipeline"],
+    "Data Analysis": ["data analytics", "analytics"],
+    "Data Visualization": ["tableau", "power bi", "powerbi", "looker"],
+    "Statistics": ["statistical analysis"],
+    "MLOps": [],
+
+    # Testing and quality
+    "Unit Testing": ["unit tests", "pytest", "junit", "jest"],
+    "Test Automation": ["automated testing", "selenium", "cypress", "playwright"],
+    "TDD": ["test-driven development", "test driven development"],
+
+    # Practices and architecture
+    "Agile": ["scrum", "kanban"],
+    "System Design": ["distributed systems", "scalable systems", "software architecture"],
+    "Security": ["cybersecurity", "application security", "appsec", "owasp"],
+    "OAuth": ["oauth2", "oidc", "sso"],
+    "Performance Optimization": ["performance tuning", "profiling"],
+    "Mobile Development": ["ios", "android", "react native", "flutter"],
+
+    # Professional skills
+    "Leadership": ["team lead", "tech lead", "mentoring", "mentorship"],
+    "Project Management": ["program management", "pmp"],
+    "Product Management": ["product manager", "roadmap"],
+    "Stakeholder Management": ["stakeholders", "cross-functional"],
+    "Communication": ["written communication", "verbal communication", "presentation skills"],
+    "Excel": ["spreadsheets", "microsoft excel"],
+    "Jira": [],
+}
+
+CASE_SENSITIVE = {"R", "C", "Go", "Swift", "Rust", "Express", "Spring", "Node", "REST", "CI", "Helm", "Excel"}
@@ -0,0 +1,91 @@
+"""
+Registry of resume templates, discovered and validated once at startup.
+
+Every package under app/templates/ whose name is a number is a template and
+must provide a `generator` module exposing TEMPLATE_NAME, TEMPLATE_DESCRIPTION,
+new_document() and generate(document, resume_data). Templates that also
+expose a LAYOUT dict can be rendered by the native PDF backend.
+"""
+import hashlib
+import importlib
+import os
+from types import ModuleType
+
+import app.templates
+
+DEFAULT_TEMPLATE_ID = 1
+REQUIRED_ATTRIBUTES = ("TEMPLATE_NAME", "TEMPLATE_DESCRIPTION", "new_document", "generate")
+
+
+class UnknownTemplateError(ValueError):
+    """Raised when a template id is not in the registry."""
+
+
+class RegisteredTemplate:
+    def __init__(self, template_id: int, generator: ModuleType, version: str):
+        self.id = template_id
+        self.generator = generator
+        self.name = generator.TEMPLATE_NAME
+        self.description = generator.TEMPLATE_DESCRIPTION
+        self.version = version
+        self.native_pdf = hasattr(generator, "LAYOUT")
+
+    def info(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "version": self.version,
+            "native_pdf": self.native_pdf,
+        }
+
+
+class TemplateRegistry:
+    def __init__(self):
+        self._templates: dict[int, RegisteredTemplate] = {}
+
+    def discover(self):
+        """
+        Imports and validates every template package.
+        Raises on a broken template so it fails at startup instead of at render time.
+        """
+        templates = {}
+        for package_dir in app.templates.__path__:
+            for entry in sorted(os.listdir(package_dir)):
+                if not entry.isdigit() or not os.path.isdir(os.path.join(package_dir, entry)):
+                    continue
+                generator = importlib.import_module(f"app.templates.{entry}.generator")
+                missing = [attr for attr in REQUIRED_ATTRIBUTES if not hasattr(generator, attr)]
+                if missing:
+                    raise ImportError(f"Template {entry} is missing {', '.join(missing)}")
+                with open(generator.__file__, "rb") as f:
+                    version = hashlib.sha256(f.read()).hexdigest()
+                templates[int(entry)] = RegisteredTemplate(int(entry), generator, version)
+
+        if DEFAULT_TEMPLATE_ID not in templates:
+            raise ImportError(f"Default template {DEFAULT_TEMPLATE_ID} is not installed")
+        self._templates = templates
+        print(f"Template registry loaded templates: {sorted(templates)}")
+
+    def get(self, template_id) -> RegisteredTemplate:
+        """Looks up a template; a missing id means the default template."""
+        if not template_id:
+            template_id = DEFAULT_TEMPLATE_ID
+        try:
+            return self._templates[int(template_id)]
+        except (KeyError, ValueError):
+            raise UnknownTemplateError(f"Template {template_id} does not exist")
+
+    def __contains__(self, template_id) -> bool:
+        try:
+            self.get(template_id)
+            return True
+        except UnknownTemplateError:
+            return False
+
+    def list(self) -> list[RegisteredTemplate]:
+        return [self._templates[template_id] for template_id in sorted(self._templates)]
+
+
+template_registry = TemplateRegistry()
+template_registry.discover()
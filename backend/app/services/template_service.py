@@ -1,73 +1,75 @@
 import os
+import shutil
 import subprocess
-import importlib
-from docx import Document
+import tempfile
+from app.services.office_pool import office_pool
+from app.services.render_cache import render_cache
+from app.services.template_registry import template_registry
+from app.services import document_renderer
 
 class TemplateService:
     def __init__(self):
-        self.output_dir = "/tmp/resumes"
-        os.makedirs(self.output_dir, exist_ok=True)
+        # Templates are versioned by their source hash; drop renders made by older template code.
+        for template in template_registry.list():
+            render_cache.purge_template(template.id, template.version)
 
-    def generate_docx(self, resume_data: dict, filename: str) -> str:
+    def render_docx(self, resume_data: dict) -> bytes:
+        return document_renderer.render_docx(resume_data)
+
+    def render_pdf_native(self, resume_data: dict) -> bytes:
+        return document_renderer.render_pdf_native(resume_data)
+
+    def render(self, resume_data: dict, fmt: str, pdf_renderer_name: str = "libreoffice") -> bytes:
         """
-        Generates a DOCX file from the resume data using the specified template.
-        Returns the path to the generated file.
+        Renders the resume data as "docx" or "pdf".
+        PDF is produced natively or via DOCX + LibreOffice, depending on pdf_renderer_name.
         """
-        document = Document()
-        
-        # Determine template_id from resume_data or default to 1
-        # Note: The API passes template_id in GeneratedResume, but here we receive resume_data.
-        # Ideally, we should pass template_id to this method.
-        # For now, let's assume it might be in resume_data or we default to 1.
-        # Wait, the API call is: template_service.generate_docx(resume_data, filename)
-        # I should update the signature to accept template_id.
-        
-        template_id = resume_data.get("template_id", 1)
-        if not template_id:
-            template_id = 1
+        if fmt == "pdf" and pdf_renderer_name == "native":
+            return self.render_pdf_native(resume_data)
+        content = self.render_docx(resume_data)
+        if fmt == "pdf":
+            content = self.convert_to_pdf(content)
+        return content
 
+    def convert_to_pdf(self, docx_bytes: bytes) -> bytes:
+        """
+        Converts DOCX bytes to PDF bytes using LibreOffice.
+        Uses the long-lived worker pool when available, otherwise a one-shot LibreOffice process.
+        LibreOffice needs real files, so each call works in its own temporary directory.
+        """
+        work_dir = tempfile.mkdtemp(prefix="resume-pdf-")
+        docx_path = os.path.join(work_dir, "resume.docx")
+        pdf_path = os.path.join(work_dir, "resume.pdf")
         try:
-            # Dynamic import: app.templates.{template_id}.generator
-            module_name = f"app.templates.{template_id}.generator"
-            generator = importlib.import_module(module_name)
-            
-            # Call the generate function
-            generator.generate(document, resume_data)
-            
-        except ImportError:
-            print(f"Template {template_id} not found, falling back to Template 1")
-            # Fallback to template 1
-            module_name = "app.templates.1.generator"
-            generator = importlib.import_module(module_name)
-            generator.generate(document, resume_data)
-        except Exception as e:
-             print(f"Error loading template {template_id}: {e}")
-             raise e
+            with open(docx_path, "wb") as f:
+                f.write(docx_bytes)
 
-        output_path = os.path.join(self.output_dir, f"{filename}.docx")
-        document.save(output_path)
-        return output_path
+            if office_pool.enabled:
+                office_pool.convert(docx_path, pdf_path)
+            else:
+                self._convert_one_shot(docx_path, work_dir)
 
-    def convert_to_pdf(self, docx_path: str) -> str:
-        """
-        Converts a DOCX file to PDF using LibreOffice.
-        Returns the path to the generated PDF file.
-        """
+            with open(pdf_path, "rb") as f:
+                return f.read()
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _convert_one_shot(self, docx_path: str, out_dir: str):
+        # Each one-shot process gets its own profile dir so concurrent conversions don't collide.
+        profile_dir = os.path.join(out_dir, "profile")
         # libreoffice --headless --convert-to pdf <file> --outdir <dir>
         cmd = [
             "libreoffice",
+            f"-env:UserInstallation=file://{profile_dir}",
             "--headless",
             "--convert-to",
             "pdf",
             docx_path,
             "--outdir",
-            self.output_dir
+            out_dir
         ]
         try:
             subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            # The output filename will be the same as docx but with .pdf extension
-            pdf_filename = os.path.splitext(os.path.basename(docx_path))[0] + ".pdf"
-            return os.path.join(self.output_dir, pdf_filename)
         except subprocess.CalledProcessError as e:
             print(f"Error converting to PDF: {e.stderr.decode()}")
             raise Exception("PDF conversion failed")
@@ -1,107 +1,171 @@
+import io
+from docx import Document
 from docx.shared import Pt, Inches, RGBColor
+from docx.enum.style import WD_STYLE_TYPE
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml.ns import qn
 from docx.oxml import OxmlElement
 
+
+TEMPLATE_NAME = "Executive Dark"
+TEMPLATE_DESCRIPTION = "Arial, left-aligned header, bold section rules."
+
+# Page geometry, fonts and spacing for Template 2 (Arial, left-aligned header).
+# The style sheet below is compiled from these values once per process.
+LAYOUT = {
+    "font": "Arial",
+    "margin_inches": 0.4,
+    "body_size": 10,
+    "name_size": 24,
+    "heading_size": 12,
+    "heading_space_before": 10, # Slightly more space for Template 2
+    "heading_space_after": 5,
+    "heading_border_eighths": 12, # 1.5pt
+    "header_alignment": WD_ALIGN_PARAGRAPH.LEFT,
+    "contact_space_after": 10,
+    "entry_space_before": 5,
+    "entry_space_after": 2,
+    "education_space": 2,
+}
+
+
 def set_margins(document):
-    sections = document.sections
-    for section in sections:
-        section.top_margin = Inches(0.4)
-        section.bottom_margin = Inches(0.4)
-        section.left_margin = Inches(0.4)
-        section.right_margin = Inches(0.4)
-
-def add_bottom_border(paragraph):
-    p = paragraph._p
-    pPr = p.get_or_add_pPr()
+    margin = Inches(LAYOUT["margin_inches"])
+    for section in document.sections:
+        section.top_margin = margin
+        section.bottom_margin = margin
+        section.left_margin = margin
+        section.right_margin = margin
+
+def add_bottom_border(pPr):
     pBdr = OxmlElement('w:pBdr')
     pPr.insert_element_before(pBdr, 'w:shd', 'w:tabs', 'w:suppressLineNumbers', 'w:ind', 'w:jc', 'w:textAlignment', 'w:rPr')
-    
+
     bottom = OxmlElement('w:bottom')
     bottom.set(qn('w:val'), 'single')
-    bottom.set(qn('w:sz'), '12') # 1.5pt
+    bottom.set(qn('w:sz'), str(LAYOUT["heading_border_eighths"]))
     bottom.set(qn('w:space'), '1')
     bottom.set(qn('w:color'), '000000')
     pBdr.append(bottom)
 
+def _use_explicit_fonts(styles):
+    # The default template points fonts at the theme, which would override the names set below.
+    rFonts = styles.element.find(qn('w:docDefaults')).find(qn('w:rPrDefault')).find(qn('w:rPr')).find(qn('w:rFonts'))
+    for attr in ('w:asciiTheme', 'w:hAnsiTheme', 'w:eastAsiaTheme', 'w:cstheme'):
+        rFonts.attrib.pop(qn(attr), None)
+
+def _add_paragraph_style(styles, name, base='Normal', space_before=0, space_after=0, alignment=None):
+    style = styles.add_style(name, WD_STYLE_TYPE.PARAGRAPH)
+    style.base_style = styles[base]
+    style.paragraph_format.space_before = Pt(space_before)
+    style.paragraph_format.space_after = Pt(space_after)
+    style.paragraph_format.line_spacing = 1
+    if alignment is not None:
+        style.paragraph_format.alignment = alignment
+    return style
+
+def define_styles(document):
+    """
+    Defines every paragraph and character style the template uses, so rendering
+    only has to reference them.
+    """
+    styles = document.styles
+    _use_explicit_fonts(styles)
+
+    normal = styles['Normal']
+    normal.font.name = LAYOUT["font"]
+    normal.font.size = Pt(LAYOUT["body_size"])
+    normal.paragraph_format.space_before = Pt(0)
+    normal.paragraph_format.space_after = Pt(0)
+    normal.paragraph_format.line_spacing = 1
+
+    name = _add_paragraph_style(styles, 'Resume Name', alignment=LAYOUT["header_alignment"])
+    name.font.bold = True
+    name.font.size = Pt(LAYOUT["name_size"])
+    name.font.color.rgb = RGBColor(0, 0, 0)
+
+    _add_paragraph_style(styles, 'Resume Contact', space_after=LAYOUT["contact_space_after"], alignment=LAYOUT["header_alignment"])
+
+    heading = _add_paragraph_style(
+        styles, 'Resume Heading',
+        space_before=LAYOUT["heading_space_before"], space_after=LAYOUT["heading_space_after"],
+    )
+    heading.font.bold = True
+    heading.font.size = Pt(LAYOUT["heading_size"])
+    heading.font.color.rgb = RGBColor(0, 0, 0)
+    heading.paragraph_format.keep_with_next = True
+    pPr = heading.element.get_or_add_pPr()
+    outline = OxmlElement('w:outlineLvl')
+    outline.set(qn('w:val'), '0')
+    pPr.append(outline)
+    add_bottom_border(pPr)
+
+    _add_paragraph_style(styles, 'Resume Entry', space_before=LAYOUT["entry_space_before"], space_after=LAYOUT["entry_space_after"])
+    _add_paragraph_style(styles, 'Resume Education', space_before=LAYOUT["education_space"], space_after=LAYOUT["education_space"])
+    _add_paragraph_style(styles, 'Resume Body', alignment=WD_ALIGN_PARAGRAPH.JUSTIFY)
+    _add_paragraph_style(styles, 'Resume Bullet', base='List Bullet', alignment=WD_ALIGN_PARAGRAPH.JUSTIFY)
+
+    strong = styles.add_style('Resume Strong', WD_STYLE_TYPE.CHARACTER)
+    strong.font.bold = True
+    date = styles.add_style('Resume Date', WD_STYLE_TYPE.CHARACTER)
+    date.font.italic = True
+
+def _compile_base():
+    document = Document()
+    set_margins(document)
+    define_styles(document)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    style_ids = {style.name: style.style_id for style in document.styles}
+    return buffer.getvalue(), style_ids
+
+# Compiled once at import; every render starts from a copy of this document.
+BASE_DOCX, STYLE_IDS = _compile_base()
+
+def new_document():
+    """Returns a fresh document with Template 2's margins and style sheet already applied."""
+    return Document(io.BytesIO(BASE_DOCX))
+
+def add_styled_paragraph(document, text='', style=None):
+    # Set the style id directly: python-docx resolves style names with a linear scan of the style sheet.
+    p = document.add_paragraph(text)
+    if style:
+        p._p.style = STYLE_IDS[style]
+    return p
+
+def add_styled_run(paragraph, text, style=None):
+    run = paragraph.add_run(text)
+    if style:
+        run._r.style = STYLE_IDS[style]
+    return run
+
 def add_section_heading(document, text):
-    heading = document.add_heading(text.upper(), level=1)
-    run = heading.runs[0]
-    run.font.color.rgb = RGBColor(0, 0, 0)
-    run.font.name = 'Arial'
-    run.font.size = Pt(12)
-    run.bold = True
-    
-    heading.paragraph_format.space_before = Pt(10) # Slightly more space for Template 2
-    heading.paragraph_format.space_after = Pt(5)
-    heading.paragraph_format.line_spacing = 1
-    
-    add_bottom_border(heading)
-    return heading
+    return add_styled_paragraph(document, text.upper(), style='Resume Heading')
 
 def add_normal_text(document, text, bold=False, italic=False):
-    p = document.add_paragraph()
-    p.paragraph_format.space_before = Pt(0)
-    p.paragraph_format.space_after = Pt(0)
-    p.paragraph_format.line_spacing = 1
-    p.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-    
+    p = add_styled_paragraph(document, style='Resume Body')
     run = p.add_run(text)
-    run.bold = bold
-    run.italic = italic
-    run.font.name = 'Arial'
-    run.font.size = Pt(10)
+    if bold:
+        run.bold = True
+    if italic:
+        run.italic = True
     return p
 
 def add_bullet_point(document, text):
-    p = document.add_paragraph(style='List Bullet')
-    p.paragraph_format.space_before = Pt(0)
-    p.paragraph_format.space_after = Pt(0)
-    p.paragraph_format.line_spacing = 1
-    p.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-    
-    run = p.runs[0] if p.runs else p.add_run(text)
-    if not p.runs:
-        pass
-    else:
-        run.text = text
-
-    run.font.name = 'Arial'
-    run.font.size = Pt(10)
-    return p
+    return add_styled_paragraph(document, text, style='Resume Bullet')
 
 def generate(document, resume_data):
     """
     Populates the DOCX document with resume data using Template 2 style (Arial, Left Aligned).
+    Expects a document created by new_document().
     """
-    set_margins(document)
-
-    # --- Styles ---
-    style = document.styles['Normal']
-    font = style.font
-    font.name = 'Arial'
-    font.size = Pt(10)
-    paragraph_format = style.paragraph_format
-    paragraph_format.space_before = Pt(0)
-    paragraph_format.space_after = Pt(0)
-    paragraph_format.line_spacing = 1
-
     # --- Header ---
     basic_info = resume_data.get("basic_info", {})
     name = f"{basic_info.get('first_name', '')} {basic_info.get('last_name', '')}"
-    
+
     # Name Heading (Left Aligned)
-    header = document.add_paragraph()
-    header.alignment = WD_ALIGN_PARAGRAPH.LEFT
-    header.paragraph_format.space_before = Pt(0)
-    header.paragraph_format.space_after = Pt(0)
-    
-    run = header.add_run(name)
-    run.font.color.rgb = RGBColor(0, 0, 0)
-    run.bold = True
-    run.font.name = 'Arial'
-    run.font.size = Pt(24) # Large name
-    
+    add_styled_paragraph(document, name, style='Resume Name')
+
     # Contact Info
     contact_info = []
     if basic_info.get("address"):
@@ -115,12 +179,9 @@ def generate(document, resume_data):
     if basic_info.get("phone"):
         contact_info.append(basic_info["phone"])
     if basic_info.get("linkedin_profile"):
-        contact_info.append("LinkedIn") 
-    
-    contact_paragraph = document.add_paragraph(" | ".join(contact_info))
-    contact_paragraph.alignment = WD_ALIGN_PARAGRAPH.LEFT
-    contact_paragraph.paragraph_format.space_before = Pt(0)
-    contact_paragraph.paragraph_format.space_after = Pt(10)
+        contact_info.append("LinkedIn")
+
+    add_styled_paragraph(document, " | ".join(contact_info), style='Resume Contact')
 
     # --- Summary ---
     if resume_data.get("about"):
@@ -133,20 +194,10 @@ def generate(document, resume_data):
         for skill_group in resume_data["skills"]:
             category = skill_group.get("category", "Skills")
             skills_list = ", ".join(skill_group.get("skills", []))
-            
+
             p = document.add_paragraph()
-            p.paragraph_format.space_before = Pt(0)
-            p.paragraph_format.space_after = Pt(0)
-            p.paragraph_format.line_spacing = 1
-            
-            run_cat = p.add_run(f"{category}: ")
-            run_cat.bold = True
-            run_cat.font.name = 'Arial'
-            run_cat.font.size = Pt(10)
-            
-            run_list = p.add_run(skills_list)
-            run_list.font.name = 'Arial'
-            run_list.font.size = Pt(10)
+            add_styled_run(p, f"{category}: ", style='Resume Strong')
+            p.add_run(skills_list)
 
     # --- Experience ---
     if resume_data.get("experience"):
@@ -155,21 +206,10 @@ def generate(document, resume_data):
             company = exp.get('company_name', '')
             title = exp.get('job_title', '')
             date_range = f"{exp.get('start_date', '')} - {exp.get('end_date', '')}"
-            
-            p = document.add_paragraph()
-            p.paragraph_format.space_before = Pt(5)
-            p.paragraph_format.space_after = Pt(2)
-            p.paragraph_format.line_spacing = 1
-            
-            run = p.add_run(f"{company} - {title}")
-            run.bold = True
-            run.font.name = 'Arial'
-            run.font.size = Pt(10)
-            
-            run_date = p.add_run(f" | {date_range}")
-            run_date.italic = True
-            run_date.font.name = 'Arial'
-            run_date.font.size = Pt(10)
+
+            p = add_styled_paragraph(document, style='Resume Entry')
+            add_styled_run(p, f"{company} - {title}", style='Resume Strong')
+            add_styled_run(p, f" | {date_range}", style='Resume Date')
 
             for desc in exp.get("description", []):
                 add_bullet_point(document, desc)
@@ -178,18 +218,9 @@ def generate(document, resume_data):
     if resume_data.get("projects"):
         add_section_heading(document, 'PROJECTS')
         for project in resume_data["projects"]:
-            name = project.get('name', '')
-            
-            p = document.add_paragraph()
-            p.paragraph_format.space_before = Pt(5)
-            p.paragraph_format.space_after = Pt(2)
-            p.paragraph_format.line_spacing = 1
-            
-            run = p.add_run(name)
-            run.bold = True
-            run.font.name = 'Arial'
-            run.font.size = Pt(10)
-            
+            p = add_styled_paragraph(document, style='Resume Entry')
+            add_styled_run(p, project.get('name', ''), style='Resume Strong')
+
             for desc in project.get("description", []):
                 add_bullet_point(document, desc)
 
@@ -200,36 +231,15 @@ def generate(document, resume_data):
             school = edu.get('school_name', '')
             degree = edu.get('degree', '')
             date_range = f"{edu.get('start_date', '')} - {edu.get('end_date', '')}"
-            
-            p = document.add_paragraph()
-            p.paragraph_format.space_before = Pt(2)
-            p.paragraph_format.space_after = Pt(2)
-            p.paragraph_format.line_spacing = 1
-            
-            run = p.add_run(f"{school} | {degree}")
-            run.bold = True
-            run.font.name = 'Arial'
-            run.font.size = Pt(10)
-            
-            run_date = p.add_run(f" | {date_range}")
-            run_date.font.name = 'Arial'
-            run_date.font.size = Pt(10)
+
+            p = add_styled_paragraph(document, style='Resume Education')
+            add_styled_run(p, f"{school} | {degree}", style='Resume Strong')
+            p.add_run(f" | {date_range}")
 
     # --- Achievements/Awards ---
     if resume_data.get("awards"):
         add_section_heading(document, 'ACHIEVEMENTS')
         for award in resume_data["awards"]:
-            p = document.add_paragraph(style='List Bullet')
-            p.paragraph_format.space_before = Pt(0)
-            p.paragraph_format.space_after = Pt(0)
-            p.paragraph_format.line_spacing = 1
-            p.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-            
-            run = p.add_run(f"{award.get('name', '')}: ")
-            run.bold = True
-            run.font.name = 'Arial'
-            run.font.size = Pt(10)
-            
-            run_desc = p.add_run(award.get('description', ''))
-            run_desc.font.name = 'Arial'
-            run_desc.font.size = Pt(10)
+            p = add_styled_paragraph(document, style='Resume Bullet')
+            add_styled_run(p, f"{award.get('name', '')}: ", style='Resume Strong')
+            p.add_run(award.get('description', ''))
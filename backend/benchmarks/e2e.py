@@ -0,0 +1,177 @@
+"""
+End-to-end throughput benchmark: concurrent users driving the FastAPI app, offline.
+
+Every user registers, uploads a resume (POST /user-profile/), then generates
+--requests resumes (POST /resume/generate-resume), each for a fresh job
+description, and downloads each one as DOCX. Model calls go to the replay
+backend (app/services/llm_backend.py), so fixtures must be recorded once first:
+
+    LLM_BACKEND=record LLM_FIXTURES_DIR=llm-fixtures uvicorn main:app
+    # ...create a profile and generate a resume through the API...
+
+Usage (from the backend directory):
+    python -m benchmarks.e2e --users 20 --requests 3
+    python -m benchmarks.e2e --users 50 --latency-ms 0 --output e2e.json
+
+The app runs in-process (httpx ASGI transport) against a temporary SQLite
+database and render cache. The generation and ATS caches are off unless
+--with-caches is given, so every generation runs the whole pipeline. Replay
+latency is the recorded latency times --latency-scale, or --latency-ms.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import uuid
+
+JOB_DESCRIPTION = (
+    "Senior Backend Engineer ({tag}). Design and operate Python and Go microservices on Kubernetes in AWS. "
+    "Own PostgreSQL and Kafka pipelines, improve observability with Prometheus and Grafana, and mentor engineers."
+)
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def _configure(args):
+    """Settings are read at import, so this must run before anything under app/ is imported."""
+    workdir = tempfile.mkdtemp(prefix="resume-e2e-")
+    os.environ["LLM_BACKEND"] = "replay"
+    os.environ["LLM_FIXTURES_DIR"] = os.path.abspath(args.fixtures)
+    os.environ["LLM_REPLAY_LATENCY_SCALE"] = str(args.latency_scale)
+    if args.latency_ms is not None:
+        os.environ["LLM_REPLAY_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["RENDER_CACHE_DIR"] = os.path.join(workdir, "render-cache")
+    if not args.with_caches:
+        os.environ["GENERATION_CACHE_MAX_ENTRIES"] = "0"
+        os.environ["ATS_CACHE_ENABLED"] = "false"
+    # The database URL is relative to the working directory
+    os.chdir(workdir)
+    return workdir
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+
+    async def call(self, endpoint: str, request):
+        start = time.perf_counter()
+        response = await request
+        self.latencies.setdefault(endpoint, []).append((time.perf_counter() - start) * 1000)
+        if response.status_code >= 400:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+            print(f"{endpoint}: {response.status_code} {response.text[:200]}")
+        return response
+
+
+async def _user(client, recorder: Recorder, resume_docx: bytes, requests: int):
+    email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+    response = await recorder.call("auth/register", client.post(
+        "/api/v1/auth/register", data={"email": email, "password": "bench"}
+    ))
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    response = await recorder.call("user-profile", client.post(
+        "/api/v1/user-profile/", params={"profile_name": "Bench"}, headers=headers,
+        files={"resume": ("resume.docx", resume_docx, "application/octet-stream")},
+    ))
+    if response.status_code >= 400:
+        return
+    profile_id = response.json()["id"]
+
+    for i in range(requests):
+        response = await recorder.call("generate-resume", client.post(
+            "/api/v1/resume/generate-resume", headers=headers, params={
+                "profile_id": profile_id,
+                "job_description": JOB_DESCRIPTION.format(tag=f"{email}-{i}"),
+                "generation_name": f"Bench {i}",
+                "template_id": 1,
+            }
+        ))
+        if response.status_code >= 400:
+            continue
+        await recorder.call("download", client.get(
+            f"/api/v1/resume/download/{response.json()['id']}", params={"format": "docx"}, headers=headers
+        ))
+
+
+async def run(users: int, requests: int, size: str) -> dict:
+    import httpx
+    import main
+    from app.services.template_service import template_service
+    from benchmarks.pdf_backends import build_resume
+    from benchmarks.rendering import SIZES
+
+    roles, bullets, projects = SIZES[size]
+    resume_docx = template_service.render_docx({**build_resume(roles, bullets, projects), "template_id": 1})
+
+    recorder = Recorder()
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(_user(client, recorder, resume_docx, requests) for _ in range(users)))
+        elapsed = time.perf_counter() - start
+
+    results = []
+    print(f"\n{'endpoint':<18}{'count':>7}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>9}")
+    for endpoint, latencies in recorder.latencies.items():
+        latencies.sort()
+        result = {
+            "endpoint": endpoint,
+            "count": len(latencies),
+            "errors": recorder.errors.get(endpoint, 0),
+            "p50_ms": round(_percentile(latencies, 0.50), 1),
+            "p95_ms": round(_percentile(latencies, 0.95), 1),
+            "p99_ms": round(_percentile(latencies, 0.99), 1),
+            "rps": round(len(latencies) / elapsed, 2),
+        }
+        results.append(result)
+        print(f"{endpoint:<18}{result['count']:>7}{result['errors']:>8}{result['p50_ms']:>10.1f}"
+              f"{result['p95_ms']:>10.1f}{result['p99_ms']:>10.1f}{result['rps']:>9.2f}")
+    print(f"\n{users} users in {elapsed:.1f}s")
+    return {"elapsed_s": round(elapsed, 3), "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10, help="concurrent users")
+    parser.add_argument("--requests", type=int, default=3, help="generations per user")
+    parser.add_argument("--size", choices=("small", "medium", "large", "xlarge"), default="medium", help="uploaded resume size")
+    parser.add_argument("--fixtures", default="llm-fixtures", help="recorded fixtures (LLM_FIXTURES_DIR)")
+    parser.add_argument("--latency-ms", type=float, help="fixed replay latency per model call")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="multiplier on recorded latencies")
+    parser.add_argument("--with-caches", action="store_true", help="keep the generation and ATS caches on")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output) if args.output else None
+    commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    workdir = _configure(args)
+    report = asyncio.run(run(args.users, args.requests, args.size))
+
+    if output:
+        with open(output, "w") as f:
+            json.dump({
+                "commit": commit,
+                "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "users": args.users,
+                "requests_per_user": args.requests,
+                "size": args.size,
+                "latency_ms": args.latency_ms,
+                "latency_scale": args.latency_scale,
+                "caches": args.with_caches,
+                "workdir": workdir,
+                **report,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
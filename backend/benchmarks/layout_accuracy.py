@@ -0,0 +1,61 @@
+"""
+Checks the layout estimator against the native PDF backend.
+
+Each fixed fixture is estimated and rendered with every template that has a
+LAYOUT; the estimate rounded up must equal the rendered page count.
+
+Usage (from the backend directory):
+    python -m benchmarks.layout_accuracy
+
+Exits with status 1 when any fixture's page count is misestimated.
+"""
+import math
+import sys
+
+import pymupdf
+
+from benchmarks.pdf_backends import build_resume
+from app.services import layout_estimator
+from app.services.document_renderer import render_pdf_native
+from app.services.template_registry import template_registry
+
+# (roles, bullets per role, projects): from a short one-pager to a long CV
+FIXTURES = [(2, 3, 1), (4, 4, 2), (6, 5, 2), (8, 6, 3), (12, 6, 3), (16, 7, 4), (24, 8, 6)]
+
+# Bullets that wrap over several lines, with hyphens and slashes the renderer may break after
+LONG_BULLET = (
+    "Led the migration of 40 event-driven services from a self-managed RabbitMQ cluster to Kafka on "
+    "Kubernetes, rewriting the CI/CD pipelines and on-call runbooks and cutting p99 end-to-end latency by 35%"
+)
+
+
+def wrapped_resume(roles: int, bullets: int, projects: int) -> dict:
+    resume_data = build_resume(roles, bullets, projects)
+    for entry in resume_data["experience"]:
+        entry["description"] = [" ".join([LONG_BULLET] * (1 + j % 3)) for j in range(bullets)]
+    return resume_data
+
+
+def main():
+    failures = 0
+    print(f"{'template':<10}{'fixture':<20}{'estimated':>10}{'rendered':>10}")
+    for template in template_registry.list():
+        if not template.native_pdf:
+            continue
+        layout = template.generator.LAYOUT
+        for build in (build_resume, wrapped_resume):
+            for fixture in FIXTURES:
+                resume_data = {**build(*fixture), "template_id": template.id}
+                estimate = layout_estimator.paginate(layout_estimator.measure(resume_data, layout), layout)
+                pages = len(pymupdf.open(stream=render_pdf_native(resume_data), filetype="pdf"))
+                name = f"{'wrapped ' if build is wrapped_resume else ''}{fixture}"
+                mark = "" if math.ceil(estimate) == pages else "  MISMATCH"
+                failures += bool(mark)
+                print(f"{template.id:<10}{name:<20}{estimate:>10.2f}{pages:>10}{mark}")
+    if failures:
+        print(f"{failures} fixture(s) misestimated")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Compares the native PDF backend against the DOCX -> LibreOffice path.
+
+Usage (from the backend directory):
+    python -m benchmarks.pdf_backends --roles 6 --bullets 5 --runs 10
+
+The LibreOffice path is skipped when neither the worker pool nor the
+`libreoffice` binary is available.
+"""
+import argparse
+import shutil
+import statistics
+import time
+
+from app.services.office_pool import office_pool
+from app.services.template_registry import template_registry
+from app.services.template_service import template_service
+
+
+def build_resume(roles: int, bullets: int, projects: int = 1) -> dict:
+    return {
+        "basic_info": {
+            "first_name": "Jane",
+            "last_name": "Doe",
+            "phone": "555-0100",
+            "email": "jane@example.com",
+            "address": {"city": "Austin", "state": "TX"},
+            "linkedin_profile": "https://linkedin.com/in/janedoe",
+        },
+        "about": "Backend engineer with a decade of experience building reliable, observable distributed systems. " * 3,
+        "skills": [
+            {"category": "Languages", "skills": ["Python", "Go", "TypeScript", "SQL"]},
+            {"category": "Cloud", "skills": ["AWS", "GCP", "Kubernetes", "Terraform"]},
+        ],
+        "experience": [
+            {
+                "company_name": f"Company {i}",
+                "job_title": "Senior Software Engineer",
+                "start_date": f"{2010 + i}",
+                "end_date": f"{2011 + i}",
+                "location": "Remote",
+                "description": [
+                    f"Cut p99 latency of service {j} by {10 + j}% by redesigning its caching layer and batching writes"
+                    for j in range(bullets)
+                ],
+            }
+            for i in range(roles)
+        ],
+        "projects": [
+            {"name": f"Open-source project {i}", "description": [f"Built a sampling tracer used by {40 + i} teams"]}
+            for i in range(projects)
+        ],
+        "education": [{
+            "school_name": "State University", "degree": "BSc", "field_of_study": "Computer Science",
+            "start_date": "2006", "end_date": "2010", "description": "",
+        }],
+        "awards": [{"name": "Engineering Award", "issuer": "Company 1", "issue_date": "2015", "description": "For the tracer"}],
+    }
+
+
+def time_runs(fn, runs: int) -> dict:
+    timings = []
+    size = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        size = len(fn())
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "median_ms": statistics.median(timings),
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "bytes": size,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--roles", type=int, default=6)
+    parser.add_argument("--bullets", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    libreoffice_available = office_pool.enabled or shutil.which("libreoffice") is not None
+    print(f"{'template':<10}{'backend':<14}{'median ms':>12}{'p95 ms':>12}{'bytes':>10}")
+    for template in template_registry.list():
+        resume_data = {**build_resume(args.roles, args.bullets), "template_id": template.id}
+        backends = {}
+        if template.native_pdf:
+            backends["native"] = lambda: template_service.render(resume_data, "pdf", "native")
+        if libreoffice_available:
+            backends["libreoffice"] = lambda: template_service.render(resume_data, "pdf", "libreoffice")
+        else:
+            print(f"{template.id:<10}{'libreoffice':<14}{'skipped (LibreOffice not installed)':>34}")
+        for name, fn in backends.items():
+            result = time_runs(fn, args.runs)
+            print(f"{template.id:<10}{name:<14}{result['median_ms']:>12.1f}{result['p95_ms']:>12.1f}{result['bytes']:>10}")
+    office_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
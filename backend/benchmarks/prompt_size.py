@@ -0,0 +1,56 @@
+"""
+Resume agent input size: plain ResumeInput JSON vs the compact serializer.
+
+Usage (from the backend directory):
+    python -m benchmarks.prompt_size
+    python -m benchmarks.prompt_size --count-tokens   # exact counts from the Gemini API
+
+Without --count-tokens, tokens are estimated from the character count
+(prompt_serializer.CHARS_PER_TOKEN). With it, each input is sent to the
+count_tokens endpoint of the resume agent's model, which needs GOOGLE_API_KEY.
+"""
+import argparse
+
+from benchmarks.pdf_backends import build_resume
+from benchmarks.rendering import SIZES
+from app.agents.resume_tailor_agent.schema import ResumeInput
+from app.agents.resume_tailor_agent.sub_agents.resume_agent.agent import resume_agent
+from app.services.prompt_serializer import estimate_tokens, serialize_resume_input
+
+JOB_DESCRIPTION = (
+    "Senior Backend Engineer. Design and operate Python and Go microservices on Kubernetes in AWS. "
+    "Own PostgreSQL and Kafka pipelines, improve observability with Prometheus and Grafana, and mentor engineers. "
+) * 4
+
+
+def _counter(exact: bool):
+    if not exact:
+        return estimate_tokens
+    from google import genai
+
+    client = genai.Client()
+    return lambda text: client.models.count_tokens(model=resume_agent.model, contents=text).total_tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--count-tokens", action="store_true", help="count tokens with the Gemini API")
+    args = parser.parse_args()
+
+    count = _counter(args.count_tokens)
+    unit = "tokens" if args.count_tokens else "~tokens"
+    print(f"{'size':<8}{'plain chars':>12}{'compact chars':>15}{'plain ' + unit:>16}{'compact ' + unit:>18}{'saved':>8}")
+    for size in args.sizes:
+        roles, bullets, projects = SIZES[size]
+        resume_input = ResumeInput(
+            existing_resume=build_resume(roles, bullets, projects),
+            job_description=JOB_DESCRIPTION,
+        )
+        plain, compact = resume_input.model_dump_json(), serialize_resume_input(resume_input)
+        before, after = count(plain), count(compact)
+        print(f"{size:<8}{len(plain):>12}{len(compact):>15}{before:>16}{after:>18}{1 - after / before:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
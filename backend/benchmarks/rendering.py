@@ -0,0 +1,172 @@
+"""
+Rendering benchmark suite: every template x stage x payload size.
+
+Stages:
+    generate     generator.generate() into a fresh document (no serialization)
+    docx         TemplateService.render_docx, i.e. generate + save to bytes
+    pdf-native   native PDF backend, for templates that have a LAYOUT
+    pdf-office   DOCX -> LibreOffice conversion (pool or one-shot binary)
+    estimate     layout estimator page count, for templates that have a LAYOUT
+
+Usage (from the backend directory):
+    python -m benchmarks.rendering --output bench.json
+    python -m benchmarks.rendering --sizes small large --skip-libreoffice
+    python -m benchmarks.rendering --output new.json --compare old.json
+
+Timings are wall-clock medians over --runs iterations. Peak memory is measured
+with tracemalloc in a separate, untimed run, so tracing overhead does not
+skew the timings. It covers Python allocations only: lxml's document trees
+(libxml2) and the LibreOffice process are not included.
+"""
+import argparse
+import datetime
+import json
+import platform
+import shutil
+import subprocess
+import tracemalloc
+
+from benchmarks.pdf_backends import build_resume, time_runs
+from app.services import layout_estimator
+from app.services.office_pool import office_pool
+from app.services.template_registry import template_registry
+from app.services.template_service import template_service
+
+# name -> (roles, bullets per role, projects)
+SIZES = {
+    "small": (2, 3, 1),
+    "medium": (6, 5, 2),
+    "large": (24, 8, 6),
+    "xlarge": (48, 10, 12),  # 480 experience bullets
+}
+
+
+def _stages(template, resume_data: dict, libreoffice: bool) -> dict:
+    layout = getattr(template.generator, "LAYOUT", None)
+    stages = {
+        "generate": lambda: template.generator.generate(template.generator.new_document(), resume_data),
+        "docx": lambda: template_service.render_docx(resume_data),
+    }
+    if layout:
+        stages["pdf-native"] = lambda: template_service.render_pdf_native(resume_data)
+    if libreoffice:
+        docx_bytes = template_service.render_docx(resume_data)
+        stages["pdf-office"] = lambda: template_service.convert_to_pdf(docx_bytes)
+    if layout:
+        stages["estimate"] = lambda: layout_estimator.paginate(layout_estimator.measure(resume_data, layout), layout)
+    return stages
+
+
+def _peak_memory_kib(fn) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def _sized(fn):
+    """time_runs() reports len() of the result; stages that don't return bytes count as 0."""
+    def run():
+        result = fn()
+        return result if isinstance(result, (bytes, bytearray)) else b""
+    return run
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run(sizes: list[str], runs: int, libreoffice: bool) -> dict:
+    results = []
+    for size in sizes:
+        roles, bullets, projects = SIZES[size]
+        for template in template_registry.list():
+            resume_data = {**build_resume(roles, bullets, projects), "template_id": template.id}
+            for stage, fn in _stages(template, resume_data, libreoffice).items():
+                fn()  # warm-up: font loading, worker start-up, caches
+                timing = time_runs(_sized(fn), runs)
+                results.append({
+                    "template": template.id,
+                    "template_version": template.version,
+                    "size": size,
+                    "stage": stage,
+                    "median_ms": round(timing["median_ms"], 3),
+                    "p95_ms": round(timing["p95_ms"], 3),
+                    "peak_kib": round(_peak_memory_kib(fn), 1),
+                    "bytes": timing["bytes"],
+                })
+                print(f"{template.id:<10}{size:<8}{stage:<12}{timing['median_ms']:>12.1f}"
+                      f"{timing['p95_ms']:>12.1f}{results[-1]['peak_kib']:>12.0f}")
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "runs": runs,
+        "libreoffice": libreoffice,
+        "sizes": {name: SIZES[name] for name in sizes},
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> int:
+    """Prints median changes against a baseline; returns the number of regressions over threshold."""
+    key = lambda r: (r["template"], r["size"], r["stage"])
+    previous = {key(r): r for r in baseline["results"]}
+    regressions = 0
+    print(f"\nvs {baseline.get('commit') or 'baseline'}:")
+    for result in current["results"]:
+        old = previous.get(key(result))
+        if not old or not old["median_ms"]:
+            continue
+        change = (result["median_ms"] - old["median_ms"]) / old["median_ms"]
+        flag = ""
+        if change > threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"{result['template']:<10}{result['size']:<8}{result['stage']:<12}"
+              f"{old['median_ms']:>10.1f} -> {result['median_ms']:<10.1f}{change:>+8.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="median slowdown, as a fraction, reported as a regression (default 0.2)")
+    parser.add_argument("--skip-libreoffice", action="store_true")
+    args = parser.parse_args()
+
+    libreoffice = not args.skip_libreoffice and (office_pool.enabled or shutil.which("libreoffice") is not None)
+    if not libreoffice and not args.skip_libreoffice:
+        print("LibreOffice not installed; skipping the pdf-office stage")
+
+    print(f"{'template':<10}{'size':<8}{'stage':<12}{'median ms':>12}{'p95 ms':>12}{'peak KiB':>12}")
+    try:
+        report = run(args.sizes, args.runs, libreoffice)
+    finally:
+        office_pool.shutdown()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
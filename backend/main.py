@@ -2,9 +2,19 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from fastapi import FastAPI
+from fastapi.responses import Response
 from app.core.config import settings
-from app.api.v1.endpoints import test_agent, resume, user_profile, auth
+from app.api.v1.endpoints import test_agent, resume, user_profile, auth, templates
 from app.core.database import engine, Base
+from app.services.office_pool import office_pool
+from app.services.render_cache import render_cache
+from app.services.export_service import export_service
+from app.services.render_jobs import render_jobs
+from app.services.resume_generation import generation_jobs, result_cache, single_flight
+from app.services.ats_cache import ats_cache
+from app.services.session_store import session_store
+from app.services import metrics
+from app.services.llm_admission import admission
 
 # Create tables
 Base.metadata.create_all(bind=engine)
@@ -35,10 +45,29 @@ app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(test_agent.router, prefix="/api/v1/test", tags=["test"])
 app.include_router(resume.router, prefix="/api/v1/resume", tags=["resume"])
 app.include_router(user_profile.router, prefix="/api/v1/user-profile", tags=["user-profile"])
+app.include_router(templates.router, prefix="/api/v1/templates", tags=["templates"])
+
+@app.on_event("shutdown")
+async def shutdown_generation_jobs():
+    await generation_jobs.shutdown()
+
+@app.on_event("shutdown")
+def shutdown_render_workers():
+    render_jobs.shutdown()
+    export_service.shutdown()
+    office_pool.shutdown()
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "version": settings.VERSION}
+    return {"status": "healthy", "version": settings.VERSION, "render_cache": render_cache.stats(), "render_jobs": render_jobs.stats(),
+            "generation_jobs": generation_jobs.stats(), "ats_cache": ats_cache.stats(),
+            "generation_cache": {**result_cache.stats(), **single_flight.stats()},
+            "adk_sessions": session_store.stats(), "llm_admission": admission.stats()}
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Model call latency, tokens, cost, failures and retries, admission queue state and ADK session gauges, in Prometheus text format."""
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
 
 if __name__ == "__main__":
     import uvicorn